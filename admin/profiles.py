@@ -0,0 +1,82 @@
+import io
+import logging
+import os
+import pstats
+
+import pandas as pd
+import streamlit as st
+
+from auth.guard import require_admin
+from config.settings import get_settings
+from utils.profiling import COLLAPSED_SUFFIX, PSTATS_SUFFIX, list_profiles
+
+logger = logging.getLogger(__name__)
+
+require_admin()
+
+st.title('Profiles')
+st.caption(
+    f'Perfis de CPU das execuções dos relatórios. As execuções com mais de '
+    f'{get_settings().profiling.threshold_ms:.0f} ms guardam um perfil por amostragem.'
+)
+
+# Kept outside the widget state, so the option survives the navigation to the report pages
+st.session_state.profiling_session = st.toggle(
+    'Perfilar as minhas execuções dos relatórios com cProfile',
+    value=st.session_state.get('profiling_session', False),
+    help='Só nesta sessão. O cProfile torna a execução mais lenta, todas as execuções ficam guardadas.',
+)
+
+profiles = list_profiles()
+
+if not profiles:
+    st.info('Ainda não existem perfis guardados.')
+    st.stop()
+
+summary = pd.DataFrame([
+    {
+        'Início': profile['started'],
+        'Execução': profile['name'],
+        'Duração (ms)': profile['duration_ms'],
+        'Modo': profile['mode'],
+        'Ficheiros': ', '.join(sorted(profile['files'])),
+        'Trace': profile['trace_id'],
+    }
+    for profile in profiles
+])
+st.dataframe(summary, hide_index=True, use_container_width=True)
+
+
+def profile_label(index: int) -> str:
+    profile = profiles[index]
+    return f'{profile["started"]:%Y-%m-%d %H:%M:%S} · {profile["name"]} · {profile["duration_ms"]:.0f} ms'
+
+
+selected = profiles[st.selectbox('Perfil', options=range(len(profiles)), format_func=profile_label)]
+files = selected['files']
+
+columns = st.columns(2)
+for column, suffix, label in (
+    (columns[0], PSTATS_SUFFIX, 'Descarregar .pstats'),
+    (columns[1], COLLAPSED_SUFFIX, 'Descarregar flamegraph (.collapsed)'),
+):
+    if suffix in files:
+        with open(files[suffix], 'rb') as file:
+            column.download_button(
+                label, data=file.read(), file_name=os.path.basename(files[suffix]), mime='application/octet-stream'
+            )
+
+if PSTATS_SUFFIX in files:
+    st.subheader('Funções com maior tempo acumulado')
+    output = io.StringIO()
+    pstats.Stats(files[PSTATS_SUFFIX], stream=output).strip_dirs().sort_stats('cumulative').print_stats(40)
+    st.code(output.getvalue(), language=None)
+elif COLLAPSED_SUFFIX in files:
+    st.subheader('Pilhas mais frequentes')
+    with open(files[COLLAPSED_SUFFIX], encoding='utf-8') as file:
+        stacks = [line.rsplit(' ', 1) for line in file.read().splitlines()[:20]]
+    st.dataframe(
+        pd.DataFrame([{'Amostras': int(count), 'Pilha': stack.replace(';', ' → ')} for stack, count in stacks]),
+        hide_index=True,
+        use_container_width=True,
+    )
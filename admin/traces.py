@@ -0,0 +1,92 @@
+import datetime
+import json
+import logging
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from auth.guard import require_admin
+from utils.tracing import read_traces, waterfall
+
+logger = logging.getLogger(__name__)
+
+require_admin()
+
+st.title('Traces')
+st.caption('Execuções recentes das páginas, do pré-carregamento e do worker, com a duração de cada etapa.')
+
+limit = st.sidebar.number_input('Execuções', min_value=10, max_value=500, value=50, step=10, key='traces_limit')
+runs = read_traces(limit=int(limit))
+
+if not runs:
+    st.info('Ainda não existem execuções registadas.')
+    st.stop()
+
+summary = pd.DataFrame([
+    {
+        'Início': datetime.datetime.fromtimestamp(spans[0]['start']),
+        'Execução': spans[0]['name'],
+        'Utilizador': spans[0].get('attributes', {}).get('user'),
+        'Duração (ms)': spans[0]['duration_ms'],
+        'Spans': len(spans),
+        'Erro': spans[0].get('attributes', {}).get('error'),
+        'Trace': spans[0]['trace_id'],
+    }
+    for spans in runs
+])
+
+slow_only = st.sidebar.toggle('Só execuções lentas', key='traces_slow_only')
+if slow_only:
+    threshold = st.sidebar.number_input('Mais de (ms)', min_value=0, value=1000, step=100, key='traces_threshold')
+    summary = summary[summary['Duração (ms)'] >= threshold]
+
+st.dataframe(summary, hide_index=True, use_container_width=True)
+
+if summary.empty:
+    st.stop()
+
+
+def run_label(row: int) -> str:
+    run = summary.loc[row]
+    return f'{run["Início"]:%H:%M:%S} · {run["Execução"]} · {run["Duração (ms)"]:.0f} ms'
+
+
+selected = st.selectbox('Execução', options=summary.index, format_func=run_label, key='traces_selected')
+
+spans = pd.DataFrame(waterfall(runs[selected]))
+spans['end_ms'] = spans['offset_ms'] + spans['duration_ms']
+spans['Etapa'] = [f'{"· " * depth}{name}' for depth, name in zip(spans['depth'], spans['name'])]
+spans['position'] = range(len(spans))
+spans['Tipo'] = spans['name'].str.split('.').str[0]
+spans['Detalhes'] = [
+    ', '.join(f'{key}={value}' for key, value in attributes.items()) if isinstance(attributes, dict) else ''
+    for attributes in spans.get('attributes', pd.Series([None] * len(spans)))
+]
+
+chart = (
+    alt
+    .Chart(spans)
+    .mark_bar()
+    .encode(
+        x=alt.X('offset_ms:Q', title='ms desde o início'),
+        x2='end_ms:Q',
+        # One row per span, also when spans share a name (e.g. one per year)
+        y=alt.Y('position:O', title=None, axis=alt.Axis(labelExpr=f'{json.dumps(list(spans["Etapa"]))}[datum.value]')),
+        color=alt.Color('Tipo:N', legend=alt.Legend(orient='bottom')),
+        tooltip=['name', 'duration_ms', 'offset_ms', 'thread', 'Detalhes'],
+    )
+    .properties(height=max(120, 24 * len(spans)))
+)
+st.altair_chart(chart, use_container_width=True)
+
+st.dataframe(
+    spans[['Etapa', 'offset_ms', 'duration_ms', 'thread', 'Detalhes']],
+    hide_index=True,
+    use_container_width=True,
+    column_config={
+        'offset_ms': st.column_config.NumberColumn('Início (ms)', format='%.1f'),
+        'duration_ms': st.column_config.NumberColumn('Duração (ms)', format='%.1f'),
+        'thread': st.column_config.TextColumn('Thread'),
+    },
+)
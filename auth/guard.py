@@ -0,0 +1,32 @@
+import streamlit as st
+
+from config.settings import get_settings
+
+
+def require_authentication() -> None:
+    """
+    Stops the page if the user is not authenticated.
+    """
+    if not st.session_state.get('authenticated', False):
+        st.warning('🔒 Acesso negado. Por favor, faça login para visualizar esta página.')
+        st.stop()
+
+
+def is_admin() -> bool:
+    """
+    Returns whether the session user is authenticated and an administrator (ADMIN_USERS setting).
+    """
+    return bool(st.session_state.get('authenticated', False)) and (
+        str(st.session_state.get('user') or '').upper() in get_settings().admin_users
+    )
+
+
+def require_admin() -> None:
+    """
+    Stops the page if the user is not an administrator (ADMIN_USERS setting).
+    """
+    require_authentication()
+
+    if not is_admin():
+        st.warning('🔒 Acesso reservado a administradores.')
+        st.stop()
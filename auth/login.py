@@ -2,8 +2,6 @@ import logging
 
 import streamlit as st
 
-from services.authentication import AuthenticationService
-
 logger = logging.getLogger(__name__)
 
 st.caption('Por favor, informe suas credenciais para acessar o sistema.')
@@ -19,6 +17,9 @@ with st.form(key='login_form', clear_on_submit=True):
     login_btn = st.form_submit_button('Login')
 
 if login_btn:
+    # Imported on submit, so the form renders without loading the data layer and the models
+    from services.authentication import AuthenticationService  # noqa: PLC0415
+
     result = {}
     login_ok = False
 
@@ -0,0 +1,92 @@
+"""
+Benchmark of the annual revenue report pipeline.
+
+Compares the per-year pipeline (split_revenue_by_year, merge_and_equalize_by_year and
+create_final_report) with the single-pass build_final_report on synthetic data.
+
+Usage:
+    python -m benchmarks.bench_annual_revenue --customers 100000 --years 5
+"""
+
+import argparse
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from services.annual_revenue_service import AnnualRevenueService
+
+
+def generate_revenue(customers: int, start_year: int, end_year: int, density: float, seed: int) -> pd.DataFrame:
+    """
+    Generates aggregated revenue rows (Year, Customer, Amount) like the ones returned by the database.
+    """
+    rng = np.random.default_rng(seed)
+    codes = np.char.add('C', np.char.zfill(np.arange(customers).astype(str), 8))
+    frames = []
+
+    for year in range(start_year, end_year + 1):
+        mask = rng.random(customers) < density
+        amounts = np.round(rng.gamma(shape=1.5, scale=2000.0, size=int(mask.sum())), 2)
+        frames.append(pd.DataFrame({'Year': year, 'Customer': codes[mask], 'Amount': amounts}))
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def best_of(func: Callable[[], pd.DataFrame], repeat: int) -> tuple[float, pd.DataFrame]:
+    best = float('inf')
+    result = pd.DataFrame()
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+
+    return best, result
+
+
+def legacy_pipeline(
+    invoices: pd.DataFrame, credits: pd.DataFrame, customers: dict[str, str], start_year: int, end_year: int
+) -> pd.DataFrame:
+    df_invoices, df_credits = AnnualRevenueService.split_revenue_by_year(invoices, credits, start_year, end_year)
+    df_equalized = AnnualRevenueService.merge_and_equalize_by_year(df_invoices, df_credits)
+    return AnnualRevenueService.create_final_report(df_equalized, customers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Annual revenue report pipeline benchmark')
+    parser.add_argument('--customers', type=int, default=100_000)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    end_year = 2025
+    start_year = end_year - (args.years - 1)
+
+    invoices = generate_revenue(args.customers, start_year, end_year, density=0.7, seed=1)
+    credits = generate_revenue(args.customers, start_year, end_year, density=0.2, seed=2)
+    customers = {code: f'Cliente {code}' for code in pd.concat([invoices['Customer'], credits['Customer']]).unique()}
+
+    print(f'Customers: {args.customers}, years: {args.years}, rows: {len(invoices) + len(credits)}')
+
+    legacy_time, legacy_df = best_of(
+        lambda: legacy_pipeline(invoices, credits, customers, start_year, end_year), args.repeat
+    )
+    single_time, single_df = best_of(
+        lambda: AnnualRevenueService.build_final_report(
+            invoices, credits, customers, start_year, end_year, compact=False
+        ),
+        args.repeat,
+    )
+
+    pd.testing.assert_frame_equal(legacy_df, single_df, check_dtype=False)
+
+    print(f'{"pipeline":<12} {"seconds":>10}')
+    print(f'{"per-year":<12} {legacy_time:>10.3f}')
+    print(f'{"single-pass":<12} {single_time:>10.3f}')
+    print(f'Speedup: {legacy_time / single_time:.1f}x (outputs identical)')
+
+
+if __name__ == '__main__':
+    main()
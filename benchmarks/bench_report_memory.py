@@ -0,0 +1,76 @@
+"""
+Memory benchmark of the annual revenue report frame.
+
+Measures the size of the final report (DataFrame.memory_usage(deep=True)) and the peak
+memory allocated while building it, for the per-year pipeline with Decimal amounts as
+returned by the database, and for the single-pass build in wide and compact modes.
+
+Usage:
+    python -m benchmarks.bench_report_memory --customers 50000 --years 5
+"""
+
+import argparse
+import decimal
+import tracemalloc
+from typing import Callable
+
+import pandas as pd
+
+from benchmarks.bench_annual_revenue import generate_revenue, legacy_pipeline
+from services.annual_revenue_service import AnnualRevenueService
+
+
+def measure(func: Callable[[], pd.DataFrame]) -> tuple[int, int]:
+    """
+    Returns the deep memory usage of the built frame and the peak traced allocation.
+    """
+    tracemalloc.start()
+    try:
+        df = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return int(df.memory_usage(deep=True).sum()), peak
+
+
+def to_decimal(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts the amounts to Decimal objects, as they come from SQL Server numeric columns.
+    """
+    return df.assign(Amount=[decimal.Decimal(f'{value:.2f}') for value in df['Amount']])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Annual revenue report memory benchmark')
+    parser.add_argument('--customers', type=int, default=50_000)
+    parser.add_argument('--years', type=int, default=5)
+    args = parser.parse_args()
+
+    end_year = 2025
+    start_year = end_year - (args.years - 1)
+
+    invoices = to_decimal(generate_revenue(args.customers, start_year, end_year, density=0.7, seed=1))
+    credits = to_decimal(generate_revenue(args.customers, start_year, end_year, density=0.2, seed=2))
+    customers = {code: f'Cliente {code}' for code in pd.concat([invoices['Customer'], credits['Customer']]).unique()}
+
+    cases = {
+        'per-year': lambda: legacy_pipeline(invoices, credits, customers, start_year, end_year),
+        'single-pass': lambda: AnnualRevenueService.build_final_report(
+            invoices, credits, customers, start_year, end_year, compact=False
+        ),
+        'compact': lambda: AnnualRevenueService.build_final_report(invoices, credits, customers, start_year, end_year),
+    }
+
+    print(f'Customers: {args.customers}, years: {args.years}, rows: {len(invoices) + len(credits)}')
+    print(f'{"build":<12} {"frame MB":>10} {"peak MB":>10}')
+
+    baseline = None
+    for name, func in cases.items():
+        size, peak = measure(func)
+        baseline = baseline or size
+        print(f'{name:<12} {size / 2**20:>10.1f} {peak / 2**20:>10.1f}  ({size / baseline:.0%} of per-year)')
+
+
+if __name__ == '__main__':
+    main()
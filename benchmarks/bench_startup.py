@@ -0,0 +1,113 @@
+"""
+Startup benchmark of the dashboard: import time of the entry modules and time to first render.
+
+Every measure runs in a fresh interpreter, so nothing is served from sys.modules. The modules
+imported by main.py and the login page have a budget, the report modules are reported only.
+Time to first render runs main.py with the Streamlit testing harness, for the login form of a
+new session and for the home page of an authenticated one.
+Exits with status 1 when a budget is exceeded, so the benchmark can run in CI.
+
+Usage:
+    python -m benchmarks.bench_startup --repeat 5
+    python -m benchmarks.bench_startup --import-budget 0.1 --render-budget 1.5
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Imported by main.py on every new session, before the login form is rendered
+STARTUP_MODULES = ('config.settings', 'config.logging', 'reports.registry', 'services.prefetch_service')
+
+# Imported only when a report page or the login submit runs
+DEFERRED_MODULES = ('services.authentication', 'reports.runtime', 'services.annual_revenue_service')
+
+IMPORT_SCRIPT = """
+import sys, time
+sys.path.insert(0, {base!r})
+import streamlit
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+"""
+
+RENDER_SCRIPT = """
+import logging, os, sys, time
+sys.path.insert(0, {base!r})
+logging.disable(logging.CRITICAL)
+os.environ['PREFETCH_ENABLED'] = str({prefetch!r})
+from streamlit.testing.v1 import AppTest
+started = time.perf_counter()
+at = AppTest.from_file('main.py', default_timeout=120)
+at.session_state['authenticated'] = {authenticated!r}
+at.session_state['user'] = 'BENCH' if {authenticated!r} else None
+at.run()
+elapsed = time.perf_counter() - started
+if at.exception:
+    raise SystemExit(at.exception[0].value)
+print(elapsed)
+"""
+
+
+def run_python(script: str) -> float:
+    """
+    Runs a script in a fresh interpreter and returns the number of seconds it prints.
+    """
+    completed = subprocess.run(
+        [sys.executable, '-c', script], cwd=BASE_DIR, capture_output=True, text=True, check=False
+    )
+
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip() or completed.stdout.strip())
+
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(script: str, repeat: int) -> float:
+    """
+    Returns the median of the timings of the script over the runs.
+    """
+    return statistics.median(run_python(script) for _ in range(repeat))
+
+
+def report(name: str, elapsed: float, budget: float | None) -> bool:
+    """
+    Prints a timing against its budget and returns whether it is within the budget.
+    """
+    within = budget is None or elapsed <= budget
+    status = '' if budget is None else f'{"ok" if within else "ACIMA"} (orçamento {budget * 1000:.0f} ms)'
+    print(f'{name:<40} {elapsed * 1000:>9.1f} ms  {status}')
+
+    return within
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Dashboard startup benchmark')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--import-budget', type=float, default=0.15, help='seconds per startup module')
+    parser.add_argument('--render-budget', type=float, default=1.0, help='seconds to the first render')
+    parser.add_argument('--prefetch', action='store_true', help='start the prefetch thread, as in production')
+    args = parser.parse_args()
+
+    within = True
+
+    print(f'Import time (fresh interpreter, streamlit already imported), median of {args.repeat}')
+    for module in STARTUP_MODULES + DEFERRED_MODULES:
+        budget = args.import_budget if module in STARTUP_MODULES else None
+        elapsed = measure(IMPORT_SCRIPT.format(base=str(BASE_DIR), module=module), args.repeat)
+        within &= report(module, elapsed, budget)
+
+    print(f'\nTime to first render of main.py, median of {args.repeat}')
+    for name, authenticated in (('login (new session)', False), ('home (authenticated)', True)):
+        script = RENDER_SCRIPT.format(base=str(BASE_DIR), prefetch=args.prefetch, authenticated=authenticated)
+        within &= report(name, measure(script, args.repeat), args.render_budget)
+
+    return 0 if within else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,65 +1,178 @@
+import atexit
+import itertools
 import logging
 import logging.config
+import logging.handlers
 import os
+import queue
+import random
+import reprlib
+from typing import Any, Optional
 
-from .settings import (
-    LOG_CONSOLE_LEVEL,
-    LOG_DIR,
-    LOG_ERROR_FILE_ENABLED,
-    LOG_ERROR_FILE_LEVEL,
-    LOG_ERROR_FILENAME,
-    LOG_INFO_FILE_ENABLED,
-    LOG_INFO_FILE_LEVEL,
-    LOG_INFO_FILENAME,
-    LOG_ROOT_LEVEL,
+from .settings import get_settings
+
+_configured = False
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Limits of the parameter dumps, the total length is cut to LoggingSettings.max_repr_length
+_MAX_ITEMS = 10
+_repr = reprlib.Repr(
+    maxlevel=3,
+    maxdict=_MAX_ITEMS,
+    maxlist=_MAX_ITEMS,
+    maxtuple=_MAX_ITEMS,
+    maxset=_MAX_ITEMS,
+    maxstring=80,
+    maxother=80,
 )
 
 
-def setup_logging():
-    logging_dir = str(LOG_DIR)
-    logging_console_level = str(LOG_CONSOLE_LEVEL).upper()
-    logging_info_file_level = str(LOG_INFO_FILE_LEVEL).upper()
-    logging_info_filename = str(LOG_INFO_FILENAME)
-    logging_error_file_level = str(LOG_ERROR_FILE_LEVEL).upper()
-    logging_error_filename = str(LOG_ERROR_FILENAME)
-    logging_root_level = str(LOG_ROOT_LEVEL).upper()
+class TruncatedRepr:
+    """
+    Lazy, truncated representation of a value for log messages.
+    Pass it as an argument of the logging call (logger.debug('... %s', TruncatedRepr(params))),
+    so the value is only formatted if the record is emitted, and at most max_length characters.
+    """
+
+    __slots__ = ('max_length', 'value')
+
+    def __init__(self, value: Any, max_length: Optional[int] = None):
+        self.value = value
+        self.max_length = max_length
+
+    @staticmethod
+    def _format(value: Any) -> str:
+        if isinstance(value, str):
+            return value
+
+        # Sliced before reprlib, which would sort a whole dict or set to show its first items
+        if isinstance(value, (dict, list, tuple, set, frozenset)) and len(value) > _MAX_ITEMS:
+            items = value.items() if isinstance(value, dict) else value
+            head = itertools.islice(items, _MAX_ITEMS)
+            head = dict(head) if isinstance(value, dict) else list(head)
+            return f'{_repr.repr(head)} (+{len(value) - _MAX_ITEMS} itens)'
+
+        return _repr.repr(value)
+
+    def __str__(self) -> str:
+        max_length = self.max_length or get_settings().logging.max_repr_length
+        text = self._format(self.value)
+
+        if len(text) <= max_length:
+            return text
+
+        return f'{text[:max_length]}... ({len(text) - max_length} caracteres omitidos)'
+
+    __repr__ = __str__
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of the DEBUG records of the configured loggers, e.g. {'database': 0.1}
+    keeps one in ten debug records of database.* loggers. Other levels always pass.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+
+        if rate is None:
+            # The rate of the closest configured ancestor, as for logger levels
+            rate, prefix = 1.0, name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition('.')[0]
+            self._resolved[name] = rate
+
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
 
-    if logging_dir:
-        os.makedirs(logging_dir, exist_ok=True)
+        rate = self._rate(record.name)
+
+        return rate >= 1 or random.random() < rate
+
+
+def _stop_listener() -> None:
+    global _listener  # noqa: PLW0603
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging(force: bool = False):
+    """
+    Configures the logging handlers, once per process.
+    The records go through a queue to a background listener thread, which writes them to the
+    console and to size-bounded rotating files, so logging never waits for I/O in the caller.
+    Streamlit reruns main.py on every interaction, later calls return without reconfiguring.
+    Args:
+        force (bool): Configure again even if logging is already configured.
+    """
+    global _configured, _listener  # noqa: PLW0603
+
+    if _configured and not force:
+        return
+
+    _stop_listener()
+
+    settings = get_settings().logging
+
+    if settings.dir:
+        os.makedirs(settings.dir, exist_ok=True)
 
     handlers_config = {}
     root_handlers_list = []
 
     # Console Handler
     handlers_config['console'] = {
-        'level': logging_console_level,
+        'level': settings.console_level,
         'class': 'logging.StreamHandler',
         'formatter': 'standard',
     }
     root_handlers_list.append('console')
 
     # Info File Handler (condicional)
-    if LOG_INFO_FILE_ENABLED and logging_dir and logging_info_filename:
+    if settings.info_file_enabled and settings.dir and settings.info_filename:
         handlers_config['info_file'] = {
-            'level': logging_info_file_level,
-            'class': 'logging.FileHandler',
-            'filename': os.path.join(logging_dir, logging_info_filename),
+            'level': settings.info_file_level,
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': os.path.join(settings.dir, settings.info_filename),
             'mode': 'a',
+            'maxBytes': settings.max_bytes,
+            'backupCount': settings.backup_count,
+            'encoding': 'utf-8',
             'formatter': 'standard',
         }
         root_handlers_list.append('info_file')
 
     # Error File Handler (condicional)
-    if LOG_ERROR_FILE_ENABLED and logging_dir and logging_error_filename:
+    if settings.error_file_enabled and settings.dir and settings.error_filename:
         handlers_config['error_file'] = {
-            'level': logging_error_file_level,
-            'class': 'logging.FileHandler',
-            'filename': os.path.join(logging_dir, logging_error_filename),
+            'level': settings.error_file_level,
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': os.path.join(settings.dir, settings.error_filename),
             'mode': 'a',
+            'maxBytes': settings.max_bytes,
+            'backupCount': settings.backup_count,
+            'encoding': 'utf-8',
             'formatter': 'standard',
         }
         root_handlers_list.append('error_file')
 
+    # Records below every handler level are discarded by the loggers, before they are built
+    handler_levels = [logging.getLevelName(handler['level']) for handler in handlers_config.values()]
+    effective_root_level = max(logging.getLevelName(settings.root_level), min(handler_levels))
+
     logging_config = {
         'version': 1,
         'disable_existing_loggers': False,
@@ -72,10 +185,30 @@ def setup_logging():
             },
         },
         'handlers': handlers_config,
-        'root': {'level': logging_root_level, 'handlers': root_handlers_list},
+        # The handlers are attached to the queue listener below, not to the root logger
+        'root': {'level': effective_root_level, 'handlers': []},
     }
 
     logging.config.dictConfig(logging_config)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+
+    if settings.sampling:
+        queue_handler.addFilter(SamplingFilter(dict(settings.sampling)))
+
+    handlers = [logging.getHandlerByName(name) for name in root_handlers_list]
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    logging.getLogger().addHandler(queue_handler)
+
+    if not _configured:
+        # Flushes the queued records on exit
+        atexit.register(_stop_listener)
+
+    _configured = True
     logging.getLogger(__name__).info(
-        f'Logging configurado. Root level: {logging_root_level}. Handlers: {", ".join(root_handlers_list)}'
+        f'Logging configurado. Root level: {logging.getLevelName(effective_root_level)}. '
+        f'Handlers: {", ".join(root_handlers_list)}'
     )
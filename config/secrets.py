@@ -0,0 +1,39 @@
+import os
+import tomllib
+from pathlib import Path
+from typing import Any
+
+# Same files Streamlit reads for st.secrets, the project file overrides the global one
+SECRETS_FILES = (
+    Path.home() / '.streamlit' / 'secrets.toml',
+    Path(__file__).resolve().parent.parent / '.streamlit' / 'secrets.toml',
+)
+
+# Environment variable with the path of an alternative secrets file
+SECRETS_FILE_ENV = 'GN_SECRETS_FILE'
+
+
+def read_secrets() -> dict[str, Any]:
+    """
+    Reads the secrets from the Streamlit secrets.toml files without importing Streamlit,
+    so the configuration also loads in workers, CLIs and benchmarks.
+    Returns:
+        dict[str, Any]: The secrets by section, sections of later files override earlier ones.
+    """
+    override = os.environ.get(SECRETS_FILE_ENV)
+    files = (Path(override),) if override else SECRETS_FILES
+
+    secrets: dict[str, Any] = {}
+
+    for path in files:
+        if not path.is_file():
+            continue
+
+        with path.open('rb') as file:
+            for section, values in tomllib.load(file).items():
+                if isinstance(values, dict) and isinstance(secrets.get(section), dict):
+                    secrets[section] = {**secrets[section], **values}
+                else:
+                    secrets[section] = values
+
+    return secrets
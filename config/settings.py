@@ -1,35 +1,412 @@
+import logging
+from dataclasses import dataclass
 from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Callable, Optional
 
-import streamlit as st
+from decouple import AutoConfig
+
+from config.secrets import read_secrets
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# Database connection parameters
-DATABASE = {
-    'SERVER': st.secrets['database'].get('server'),
-    'DATABASE': st.secrets['database'].get('database'),
-    'SCHEMA': st.secrets['database'].get('schema'),
-    'USERNAME': st.secrets['database'].get('username'),
-    'PASSWORD': st.secrets['database'].get('password'),
-    'DRIVER': st.secrets['database'].get('driver'),
-    'TRUSTED_CONNECTION': st.secrets['database'].get('trusted_connection'),
-}
-
-# Debug mode
-DEBUG = st.secrets['debug'].get('production', True)
-
-# Logging configuration
-LOG_DIR = 'logs'
-LOG_ROOT_LEVEL = 'DEBUG'
-LOG_CONSOLE_LEVEL = 'INFO'
-LOG_INFO_FILE_ENABLED = True
-LOG_INFO_FILENAME = 'app_info.log'
-LOG_INFO_FILE_LEVEL = 'INFO'
-LOG_ERROR_FILE_ENABLED = True
-LOG_ERROR_FILENAME = 'app_error.log'
-LOG_ERROR_FILE_LEVEL = 'ERROR'
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    """
+    Database connection and connection pool settings.
+    """
+
+    server: Optional[str] = None
+    database: Optional[str] = None
+    schema: Optional[str] = None
+    username: Optional[str] = None
+    password: Optional[str] = None
+    driver: str = 'ODBC Driver 17 for SQL Server'
+    trusted_connection: bool = False
+    echo: bool = False  # Logs every SQL statement, for debugging only
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0  # seconds waiting for a free connection
+    pool_recycle: int = 1800  # seconds, connections older than this are replaced
+    pool_pre_ping: bool = True
+
+    def connection_config(self) -> dict[str, Any]:
+        """
+        Returns the connection parameters in the format of Generics.build_connection_string.
+        """
+        return {
+            'SERVER': self.server,
+            'DATABASE': self.database,
+            'SCHEMA': self.schema,
+            'USERNAME': self.username,
+            'PASSWORD': self.password,
+            'DRIVER': self.driver,
+            'TRUSTED_CONNECTION': self.trusted_connection,
+        }
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    """
+    Settings of the in-process result cache and of the disk cache.
+    """
+
+    result_cache_max_entries: Optional[int] = 256  # least recently used entries are evicted beyond this
+    disk_cache_enabled: bool = True  # survives restarts and deploys, shared between processes
+    disk_cache_dir: Path = BASE_DIR / 'cache'
+
+
+@dataclass(frozen=True)
+class LoggingSettings:
+    """
+    Settings of the logging handlers, see config/logging.py.
+    """
+
+    dir: str = 'logs'
+    root_level: str = 'DEBUG'
+    console_level: str = 'INFO'
+    info_file_enabled: bool = True
+    info_filename: str = 'app_info.log'
+    info_file_level: str = 'INFO'
+    error_file_enabled: bool = True
+    error_filename: str = 'app_error.log'
+    error_file_level: str = 'ERROR'
+    max_bytes: int = 10 * 1024 * 1024  # size of a log file before it rotates
+    backup_count: int = 5  # rotated files kept for each log file
+    # Fraction of the DEBUG records kept per logger (and its children), e.g. (('database', 0.1),)
+    sampling: tuple[tuple[str, float], ...] = ()
+    max_repr_length: int = 500  # characters of a parameter dump written to the log
+
+
+@dataclass(frozen=True)
+class TracingSettings:
+    """
+    Settings of the per-run tracing spans, see utils/tracing.py.
+    """
+
+    enabled: bool = True
+    filename: str = 'traces.jsonl'  # written in the logging directory
+    max_bytes: int = 20 * 1024 * 1024  # size of the file before it rotates, one backup is kept
+
+
+@dataclass(frozen=True)
+class ProfilingSettings:
+    """
+    Settings of the CPU profiling of the report runs, see utils/profiling.py.
+    """
+
+    enabled: bool = True
+    threshold_ms: float = 5000  # runs slower than this keep the profile of the sampling profiler
+    interval_ms: float = 5  # sampling interval of the stacks
+    dirname: str = 'profiles'  # written in the logging directory
+    max_files: int = 100  # profiles kept, the oldest are removed
+
+
+@dataclass(frozen=True)
+class AuthSettings:
+    """
+    Settings of the password hashing, see services/password_hashing.py.
+    Hashes made with other Argon2 parameters are rehashed with these ones at login.
+    """
+
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536  # KiB per hash, the pool uses up to hash_workers times this
+    argon2_parallelism: int = 4
+    hash_workers: int = 2  # passwords hashed or verified at the same time
+    hash_timeout: float = 10.0  # seconds a login waits for the pool, queue included
+    user_metadata_ttl: float = 60  # seconds, cache TTL of the non-secret user metadata read at login
+
+
+@dataclass(frozen=True)
+class RevenueSettings:
+    """
+    Cache policy and year range of the revenue reports, see services/annual_revenue_service.py.
+    Closed years are cached until explicitly invalidated; only the open period expires.
+    """
+
+    open_period_ttl: float = 600  # seconds
+    closed_year_grace_days: int = 31  # days after the end of a year during which it is still open (late postings)
+    min_years: int = 3  # range of years offered by the annual revenue report, ending in the current year
+    max_years: int = 5
+
+
+@dataclass(frozen=True)
+class ReportSettings:
+    """
+    Settings of the report runtime and pages, see reports/runtime.py.
+    """
+
+    loader_workers: int = 4  # datasets of a report loaded concurrently
+    default_ttl: float = 600  # seconds, cache TTL of report datasets that do not declare one
+    session_max_entries: int = 3  # built reports kept in each session, one per set of parameters
+
+
+@dataclass(frozen=True)
+class PrefetchSettings:
+    """
+    Settings of the background prefetch of the default report datasets, see services/prefetch_service.py.
+    """
+
+    enabled: bool = True
+    years: int = 5  # widest range offered by the reports, ending in the current year
+    interval: float = 0  # seconds between refreshes, 0 to prefetch only at startup
+
+
+@dataclass(frozen=True)
+class PrecomputeSettings:
+    """
+    Settings of the precompute worker (python worker.py), which writes the report datasets to the disk cache.
+    """
+
+    enabled: bool = True  # whether the dashboard reads the precomputed datasets
+    interval: float = 300  # seconds between worker runs
+    ttl: float = 600  # seconds, precomputed datasets older than this are ignored
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Deployment settings of the application, see get_settings.
+    """
+
+    debug: bool = False
+    database: DatabaseSettings = DatabaseSettings()
+    cache: CacheSettings = CacheSettings()
+    logging: LoggingSettings = LoggingSettings()
+    tracing: TracingSettings = TracingSettings()
+    profiling: ProfilingSettings = ProfilingSettings()
+    auth: AuthSettings = AuthSettings()
+    revenue: RevenueSettings = RevenueSettings()
+    reports: ReportSettings = ReportSettings()
+    prefetch: PrefetchSettings = PrefetchSettings()
+    precompute: PrecomputeSettings = PrecomputeSettings()
+    admin_users: tuple[str, ...] = ()  # usernames with access to the administration pages
+
+
+def _bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+
+    text = str(value).strip().lower()
+
+    if text in {'1', 'true', 'yes', 'y', 'on'}:
+        return True
+    if text in {'0', 'false', 'no', 'n', 'off', ''}:
+        return False
+
+    raise ValueError(f'valor booleano inválido: {value}')
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    if str(value).strip().lower() in {'', 'none'}:
+        return None
+
+    return int(value)
+
+
+def _path(value: Any) -> Path:
+    path = Path(value)
+
+    return path if path.is_absolute() else BASE_DIR / path
+
+
+def _sampling(value: Any) -> tuple[tuple[str, float], ...]:
+    if isinstance(value, dict):
+        value = ','.join(f'{name}={rate}' for name, rate in value.items())
+
+    rates = []
+
+    for item in str(value).split(','):
+        if not item.strip():
+            continue
+
+        name, _, rate = item.partition('=')
+        rate = float(rate)
+
+        if not name.strip() or not 0 <= rate <= 1:
+            raise ValueError(f'amostragem inválida: {item.strip()} (esperado logger=taxa, taxa entre 0 e 1)')
+
+        rates.append((name.strip(), rate))
+
+    return tuple(rates)
+
+
+def _names(value: Any) -> tuple[str, ...]:
+    items = value if isinstance(value, (list, tuple)) else str(value).split(',')
+
+    return tuple(str(item).strip().upper() for item in items if str(item).strip())
+
+
+def _log_level(value: Any) -> str:
+    level = str(value).strip().upper()
+
+    if level not in logging.getLevelNamesMapping():
+        raise ValueError(f'nível de log desconhecido: {value}')
+
+    return level
+
+
+def _reader(secrets: dict[str, Any]) -> Callable[..., Any]:
+    """
+    Returns a function that reads a setting from, in order of precedence: the environment,
+    the .env file of the project, the section of secrets.toml and the default.
+    """
+    env = AutoConfig(search_path=str(BASE_DIR))
+
+    def read(key: str, section: str, name: str, default: Any, cast: Callable[[Any], Any] = str) -> Any:
+        value = env(key, default=secrets.get(section, {}).get(name, default))
+
+        if value is None:
+            return None
+
+        try:
+            return cast(value)
+        except ValueError as e:
+            raise ValueError(f'Configuração inválida para {key}: {e}') from e
+
+    return read
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Loads the deployment settings, once per process.
+    Each setting is read from the environment (e.g. DB_SERVER), the .env file of the project
+    (see .env.exemple), secrets.toml ([database], [debug], [cache], [logging], [tracing],
+    [profiling], [auth], [revenue], [reports], [prefetch], [precompute] and [admin] sections)
+    or its default, and is validated against its type.
+    Returns:
+        Settings: The settings of the process.
+    Raises:
+        ValueError: If a setting has an invalid value.
+    """
+    read = _reader(read_secrets())
+    db, cache, log, tracing = DatabaseSettings(), CacheSettings(), LoggingSettings(), TracingSettings()
+    profiling, auth = ProfilingSettings(), AuthSettings()
+    revenue, reports = RevenueSettings(), ReportSettings()
+    prefetch, precompute = PrefetchSettings(), PrecomputeSettings()
+
+    # secrets.toml keeps the historical [debug] production flag
+    debug = read('DEBUG', 'debug', 'production', False, cast=_bool)
+
+    return Settings(
+        debug=debug,
+        admin_users=read('ADMIN_USERS', 'admin', 'users', '', cast=_names),
+        database=DatabaseSettings(
+            server=read('DB_SERVER', 'database', 'server', db.server),
+            database=read('DB_DATABASE', 'database', 'database', db.database),
+            schema=read('DB_SCHEMA', 'database', 'schema', db.schema),
+            username=read('DB_USERNAME', 'database', 'username', db.username),
+            password=read('DB_PASSWORD', 'database', 'password', db.password),
+            driver=read('DB_DRIVER', 'database', 'driver', db.driver),
+            trusted_connection=read('DB_TRUSTED_CONNECTION', 'database', 'trusted_connection', False, cast=_bool),
+            echo=read('DB_ECHO', 'database', 'echo', debug, cast=_bool),
+            pool_size=read('DB_POOL_SIZE', 'database', 'pool_size', db.pool_size, cast=int),
+            max_overflow=read('DB_MAX_OVERFLOW', 'database', 'max_overflow', db.max_overflow, cast=int),
+            pool_timeout=read('DB_POOL_TIMEOUT', 'database', 'pool_timeout', db.pool_timeout, cast=float),
+            pool_recycle=read('DB_POOL_RECYCLE', 'database', 'pool_recycle', db.pool_recycle, cast=int),
+            pool_pre_ping=read('DB_POOL_PRE_PING', 'database', 'pool_pre_ping', db.pool_pre_ping, cast=_bool),
+        ),
+        cache=CacheSettings(
+            result_cache_max_entries=read(
+                'RESULT_CACHE_MAX_ENTRIES',
+                'cache',
+                'result_cache_max_entries',
+                cache.result_cache_max_entries,
+                cast=_optional_int,
+            ),
+            disk_cache_enabled=read(
+                'DISK_CACHE_ENABLED', 'cache', 'disk_cache_enabled', cache.disk_cache_enabled, cast=_bool
+            ),
+            disk_cache_dir=read('DISK_CACHE_DIR', 'cache', 'disk_cache_dir', cache.disk_cache_dir, cast=_path),
+        ),
+        logging=LoggingSettings(
+            dir=read('LOG_DIR', 'logging', 'dir', log.dir),
+            root_level=read('LOG_ROOT_LEVEL', 'logging', 'root_level', log.root_level, cast=_log_level),
+            console_level=read('LOG_CONSOLE_LEVEL', 'logging', 'console_level', log.console_level, cast=_log_level),
+            info_file_enabled=read(
+                'LOG_INFO_FILE_ENABLED', 'logging', 'info_file_enabled', log.info_file_enabled, cast=_bool
+            ),
+            info_filename=read('LOG_INFO_FILENAME', 'logging', 'info_filename', log.info_filename),
+            info_file_level=read(
+                'LOG_INFO_FILE_LEVEL', 'logging', 'info_file_level', log.info_file_level, cast=_log_level
+            ),
+            error_file_enabled=read(
+                'LOG_ERROR_FILE_ENABLED', 'logging', 'error_file_enabled', log.error_file_enabled, cast=_bool
+            ),
+            error_filename=read('LOG_ERROR_FILENAME', 'logging', 'error_filename', log.error_filename),
+            error_file_level=read(
+                'LOG_ERROR_FILE_LEVEL', 'logging', 'error_file_level', log.error_file_level, cast=_log_level
+            ),
+            max_bytes=read('LOG_MAX_BYTES', 'logging', 'max_bytes', log.max_bytes, cast=int),
+            backup_count=read('LOG_BACKUP_COUNT', 'logging', 'backup_count', log.backup_count, cast=int),
+            sampling=read('LOG_SAMPLING', 'logging', 'sampling', '', cast=_sampling),
+            max_repr_length=read('LOG_MAX_REPR_LENGTH', 'logging', 'max_repr_length', log.max_repr_length, cast=int),
+        ),
+        tracing=TracingSettings(
+            enabled=read('TRACING_ENABLED', 'tracing', 'enabled', tracing.enabled, cast=_bool),
+            filename=read('TRACING_FILENAME', 'tracing', 'filename', tracing.filename),
+            max_bytes=read('TRACING_MAX_BYTES', 'tracing', 'max_bytes', tracing.max_bytes, cast=int),
+        ),
+        profiling=ProfilingSettings(
+            enabled=read('PROFILING_ENABLED', 'profiling', 'enabled', profiling.enabled, cast=_bool),
+            threshold_ms=read(
+                'PROFILING_THRESHOLD_MS', 'profiling', 'threshold_ms', profiling.threshold_ms, cast=float
+            ),
+            interval_ms=read('PROFILING_INTERVAL_MS', 'profiling', 'interval_ms', profiling.interval_ms, cast=float),
+            dirname=read('PROFILING_DIRNAME', 'profiling', 'dirname', profiling.dirname),
+            max_files=read('PROFILING_MAX_FILES', 'profiling', 'max_files', profiling.max_files, cast=int),
+        ),
+        auth=AuthSettings(
+            argon2_time_cost=read('AUTH_ARGON2_TIME_COST', 'auth', 'argon2_time_cost', auth.argon2_time_cost, cast=int),
+            argon2_memory_cost=read(
+                'AUTH_ARGON2_MEMORY_COST', 'auth', 'argon2_memory_cost', auth.argon2_memory_cost, cast=int
+            ),
+            argon2_parallelism=read(
+                'AUTH_ARGON2_PARALLELISM', 'auth', 'argon2_parallelism', auth.argon2_parallelism, cast=int
+            ),
+            hash_workers=read('AUTH_HASH_WORKERS', 'auth', 'hash_workers', auth.hash_workers, cast=int),
+            hash_timeout=read('AUTH_HASH_TIMEOUT', 'auth', 'hash_timeout', auth.hash_timeout, cast=float),
+            user_metadata_ttl=read(
+                'AUTH_USER_METADATA_TTL', 'auth', 'user_metadata_ttl', auth.user_metadata_ttl, cast=float
+            ),
+        ),
+        revenue=RevenueSettings(
+            open_period_ttl=read(
+                'REVENUE_OPEN_PERIOD_TTL', 'revenue', 'open_period_ttl', revenue.open_period_ttl, cast=float
+            ),
+            closed_year_grace_days=read(
+                'REVENUE_CLOSED_YEAR_GRACE_DAYS',
+                'revenue',
+                'closed_year_grace_days',
+                revenue.closed_year_grace_days,
+                cast=int,
+            ),
+            min_years=read('REVENUE_MIN_YEARS', 'revenue', 'min_years', revenue.min_years, cast=int),
+            max_years=read('REVENUE_MAX_YEARS', 'revenue', 'max_years', revenue.max_years, cast=int),
+        ),
+        reports=ReportSettings(
+            loader_workers=read('REPORT_LOADER_WORKERS', 'reports', 'loader_workers', reports.loader_workers, cast=int),
+            default_ttl=read('REPORT_DEFAULT_TTL', 'reports', 'default_ttl', reports.default_ttl, cast=float),
+            session_max_entries=read(
+                'REPORT_SESSION_MAX_ENTRIES', 'reports', 'session_max_entries', reports.session_max_entries, cast=int
+            ),
+        ),
+        prefetch=PrefetchSettings(
+            enabled=read('PREFETCH_ENABLED', 'prefetch', 'enabled', prefetch.enabled, cast=_bool),
+            years=read('PREFETCH_YEARS', 'prefetch', 'years', prefetch.years, cast=int),
+            interval=read('PREFETCH_INTERVAL', 'prefetch', 'interval', prefetch.interval, cast=float),
+        ),
+        precompute=PrecomputeSettings(
+            enabled=read('PRECOMPUTE_ENABLED', 'precompute', 'enabled', precompute.enabled, cast=_bool),
+            interval=read('PRECOMPUTE_INTERVAL', 'precompute', 'interval', precompute.interval, cast=float),
+            ttl=read('PRECOMPUTE_TTL', 'precompute', 'ttl', precompute.ttl, cast=float),
+        ),
+    )
+
 
 # Sage X3 database table settings
 DEFAULT_LEGACY_DATE = date(1753, 1, 1)
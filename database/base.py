@@ -1,8 +1,9 @@
-import streamlit as st
 from sqlalchemy import MetaData
 from sqlalchemy.orm import DeclarativeBase
 
-db_schema = st.secrets['database'].get('schema')
+from config.settings import get_settings
+
+db_schema = get_settings().database.schema
 
 metadata_obj = MetaData(schema=db_schema)
 
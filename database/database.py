@@ -1,4 +1,5 @@
 import logging
+import threading
 from contextlib import contextmanager
 from typing import Generator, Optional
 
@@ -6,7 +7,7 @@ from sqlalchemy import MetaData, create_engine
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, sessionmaker
 
-from config.settings import DATABASE, DEBUG
+from config.settings import DatabaseSettings, get_settings
 from utils.generics import Generics
 
 # Configurar logging
@@ -16,9 +17,17 @@ logger = logging.getLogger(__name__)
 class DatabaseManager:
     """Database session manager."""
 
-    def __init__(self, url: str, echo: bool = False):
+    def __init__(self, url: str, settings: DatabaseSettings):
         """Initialize the database session manager."""
-        self.engine = create_engine(url, echo=echo)
+        self.engine = create_engine(
+            url,
+            echo=settings.echo,
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.pool_timeout,
+            pool_recycle=settings.pool_recycle,
+            pool_pre_ping=settings.pool_pre_ping,
+        )
         self.SessionLocal = sessionmaker(
             bind=self.engine,
             autoflush=False,
@@ -43,14 +52,14 @@ class DatabaseManager:
         db_session: Optional[Session] = None
         try:
             db_session = self.SessionLocal()
-            logger.debug(f'Sessão de banco de dados {id(db_session)} criada e sendo fornecida.')
+            logger.debug('Sessão de banco de dados %s criada e sendo fornecida.', id(db_session))
             yield db_session
         except Exception as e:  # Captura exceções dentro do bloco 'with' que usa esta sessão
             logger.error(f'Exceção dentro do contexto da sessão de banco de dados {id(db_session)}: {e}', exc_info=True)
             raise
         finally:
             if db_session:
-                logger.debug(f'Fechando sessão de banco de dados {id(db_session)}.')
+                logger.debug('Fechando sessão de banco de dados %s.', id(db_session))
                 db_session.close()
 
     def commit_rollback(self, session: Session):  # noqa: PLR6301
@@ -64,19 +73,43 @@ class DatabaseManager:
             raise
 
 
-# Initialize the database session manager
-db = None
+# The database session manager is created on first use, so importing the data layer
+# (e.g. to render the login form or the navigation) does not build the engine
+_db: Optional[DatabaseManager] = None
+_db_initialized = False
+_db_lock = threading.Lock()
+
+
+def get_db_manager() -> Optional[DatabaseManager]:
+    """
+    Returns the database session manager of the process, initializing it on the first call.
+    Returns:
+        Optional[DatabaseManager]: The manager, or None if it could not be initialized.
+    """
+    global _db, _db_initialized  # noqa: PLW0603
+
+    if _db_initialized:
+        return _db
+
+    with _db_lock:
+        if _db_initialized:
+            return _db
+
+        db_settings = get_settings().database
+        db_connection_string = Generics().build_connection_string(config=db_settings.connection_config())
+
+        if db_connection_string:
+            try:
+                # Defina DB_ECHO=True para ver as queries SQL geradas, False para produção
+                _db = DatabaseManager(url=db_connection_string, settings=db_settings)  # type: ignore
+                logger.info('DatabaseSessionManager initialized successfully.')
+            except ValueError as ve:  # Erro específico da nossa validação de URL
+                logger.error(f'Configuration Error: {ve}')
+            except SQLAlchemyError as sa_err:  # Erros da criação do engine
+                logger.error(f'SQLAlchemy Engine Creation Error: {sa_err}', exc_info=True)
+            except Exception as e:  # Outros erros inesperados
+                logger.error(f'Unexpected error initializing DatabaseSessionManager: {e}', exc_info=True)
 
-DB_CONNECTION_STRING = Generics().build_connection_string(config=DATABASE)
+        _db_initialized = True
 
-if DB_CONNECTION_STRING:
-    try:
-        # Passe echo=True para ver as queries SQL geradas, False para produção
-        db = DatabaseManager(url=DB_CONNECTION_STRING, echo=DEBUG)  # type: ignore
-        logger.info('DatabaseSessionManager initialized successfully.')
-    except ValueError as ve:  # Erro específico da nossa validação de URL
-        logger.error(f'Configuration Error: {ve}')
-    except SQLAlchemyError as sa_err:  # Erros da criação do engine
-        logger.error(f'SQLAlchemy Engine Creation Error: {sa_err}', exc_info=True)
-    except Exception as e:  # Outros erros inesperados
-        logger.error(f'Unexpected error initializing DatabaseSessionManager: {e}', exc_info=True)
+    return _db
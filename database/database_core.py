@@ -5,9 +5,11 @@ from sqlalchemy import text
 from sqlalchemy.engine import Result
 from sqlalchemy.exc import SQLAlchemyError
 
-from config.settings import DATABASE
+from config.logging import TruncatedRepr
+from config.settings import get_settings
 from utils.conversions import Conversions
 from utils.local_menus import Chapter1
+from utils.tracing import traced
 
 from .condition import Condition
 from .database import DatabaseManager
@@ -20,7 +22,7 @@ class DatabaseCoreManager:
         if not db_manager:
             raise ValueError('DatabaseManager instance is required.')
         self.db_manager = db_manager
-        self.schema = str(DATABASE.get('SCHEMA', ''))
+        self.schema = str(get_settings().database.schema or '')
 
     def _build_sql_params_for_where(  # noqa: PLR0912, PLR6301
         self,
@@ -98,6 +100,7 @@ class DatabaseCoreManager:
 
         return ' AND '.join(where_parts), sql_params
 
+    @traced('db.execute_query', rows=lambda result: result.get('records'), params=('table',))
     def execute_query(self, **kwargs) -> dict[str, Any]:  # noqa: PLR0912, PLR0914, PLR0915
         """
         Executa uma consulta SELECT pura.
@@ -164,9 +167,7 @@ class DatabaseCoreManager:
         # TOP clause for SQL Server (adapt if using a different dialect)
         top_clause = f'TOP {int(limit)}' if limit and limit > 0 else ''
 
-        table = main_table_alias if main_table_alias else main_table
-
-        from_clause = f'FROM {table}'
+        from_clause = f'FROM {main_table}'
 
         if main_table_alias:
             from_clause += f' AS {main_table_alias}'
@@ -209,7 +210,10 @@ class DatabaseCoreManager:
             if 'order_by' in options and options['order_by']:
                 query_string += f' ORDER BY {options["order_by"]}'
 
-        logger.debug(f'Executing query: {query_string} with params: {final_sql_params}')
+        # Formatted only if the record is emitted, and truncated: IN lists can hold thousands of values
+        logger.debug(
+            'Executing query: %s with params: %s', TruncatedRepr(query_string), TruncatedRepr(final_sql_params)
+        )
 
         try:
             with self.db_manager.get_db() as session:
@@ -243,7 +247,7 @@ class DatabaseCoreManager:
         Helper para executar INSERT, UPDATE, DELETE e lidar com transações.
         Retorna o número de linhas afetadas se aplicável e bem-sucedido.
         """
-        logger.debug(f'Executing DML: {sql_query} with params: {params}')
+        logger.debug('Executing DML: %s with params: %s', TruncatedRepr(sql_query), TruncatedRepr(params))
         try:
             with self.db_manager.get_db() as session:
                 connection = session.connection()
@@ -2,7 +2,13 @@ import logging
 
 import streamlit as st
 
+from auth.guard import is_admin
 from config.logging import setup_logging
+from config.settings import get_settings
+from reports.registry import REPORTS
+from services.prefetch_service import PrefetchService
+from utils.profiling import profile_run
+from utils.tracing import trace_run
 
 st.set_page_config(
     page_title='GN - Dashboard',
@@ -16,6 +22,10 @@ setup_logging()
 
 logger = logging.getLogger(__name__)
 
+# Warm the report caches in background, once per process
+if get_settings().prefetch.enabled:
+    PrefetchService.start()
+
 # Initialize the Session State
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
@@ -32,17 +42,18 @@ logout_page = st.Page('auth/logout.py', title='Logout', icon=':material/logout:'
 
 auth_pages = [reset_page, logout_page]
 
-# Reports pages
-annual_revenue_page = st.Page(
-    'reports/annual_revenue_per_customer.py',
-    title='Receita Anual por Cliente',
-    icon=':material/bar_chart:',
-)
+# Reports pages, one per report declared in the registry
+reports_pages = [st.Page(report.page, title=report.title, icon=report.icon) for report in REPORTS.values()]
 
-reports_pages = [annual_revenue_page]
+# Administration pages, only for the users in ADMIN_USERS
+admin_pages = [
+    st.Page('admin/traces.py', title='Traces', icon=':material/timeline:'),
+    st.Page('admin/profiles.py', title='Profiles', icon=':material/speed:'),
+]
 
 # Define navigation
 page_dict = {}
+admin = is_admin()
 
 if st.session_state.authenticated:
     logger.info(f'User {st.session_state.user} is authenticated: {st.session_state.authenticated}')
@@ -50,6 +61,9 @@ if st.session_state.authenticated:
     page_dict['Home'] = [home_page]
     page_dict['Authentication'] = auth_pages
     page_dict['Reports'] = reports_pages
+
+    if admin:
+        page_dict['Admin'] = admin_pages
 else:
     st.title('GN - Acesso ao Sistema')
 
@@ -58,4 +72,15 @@ else:
 # Execute navigation
 pg = st.navigation(page_dict)
 
-pg.run()
+# Every script run is traced under its own trace ID, see the Traces admin page
+with trace_run(f'page.{pg.url_path or "home"}', page=pg.title, user=st.session_state.user):
+    if pg.url_path in {page.url_path for page in reports_pages}:
+        # Slow report runs keep a sampled profile; admins can profile their session with cProfile,
+        # see the Profiles admin page
+        with profile_run(
+            f'page.{pg.url_path}',
+            deterministic=admin and st.session_state.get('profiling_session', False),
+        ):
+            pg.run()
+    else:
+        pg.run()
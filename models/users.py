@@ -16,7 +16,7 @@ from sqlalchemy import (
 from sqlalchemy.dialects.mssql import TINYINT
 from sqlalchemy.orm import Mapped, mapped_column
 
-from config.settings import DATABASE, DEFAULT_LEGACY_DATETIME
+from config.settings import DEFAULT_LEGACY_DATETIME, get_settings
 from database.base import Base
 
 from .generics_mixins import ArrayColumnMixin
@@ -29,7 +29,7 @@ class Users(Base, AuditMixin, PrimaryKeyMixin, ArrayColumnMixin):
         PrimaryKeyConstraint('ROWID', name='AUTILIS_ROWID'),
         Index('AUTILIS_CODUSR', 'USR_0', unique=True),
         Index('AUTILIS_LOGIN', 'LOGIN_0'),
-        {'schema': f'{DATABASE["SCHEMA"]}'},
+        {'schema': f'{get_settings().database.schema}'},
     )
 
     name: Mapped[str] = mapped_column('NOMUSR_0', Unicode(30, 'Latin1_General_BIN2'), default=text("''"))
@@ -1,34 +1,56 @@
 import datetime
 import logging
+import tempfile
 
+import numpy as np
+import pandas as pd
 import streamlit as st
 
-from services.annual_revenue_service import AnnualRevenueService
-from services.customer_service import CustomerService
-from utils.comparison_table_data import adjust_table_height, config_columns_to_annual_revenue
+from auth.guard import require_authentication
+from config.settings import get_settings
+from reports.registry import ANNUAL_REVENUE_PER_CUSTOMER
+from reports.runtime import ReportRuntime
+from services.annual_revenue_service import AnnualRevenueService, ReportGranularity
+from services.country_services import CountryService
+from utils.comparison_table_data import (
+    adjust_table_height,
+    annual_revenue_column_label,
+    config_columns_to_annual_revenue,
+    config_columns_to_customer_ranking,
+)
+from utils.customer_search import CustomerSearchIndex
+from utils.fragments import traced_fragment
+from utils.report_export import EXPORT_FORMATS, export_report
+from utils.report_table import page_count, paginate, sort_positions
+from utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
+REPORT_STATE_KEY = 'annual_revenue_report'
+PAGE_SIZES = [50, 100, 250, 500]
+GRANULARITY_LABELS = {
+    ReportGranularity.YEAR: 'Anual',
+    ReportGranularity.QUARTER: 'Trimestral',
+    ReportGranularity.MONTH: 'Mensal',
+    ReportGranularity.YTD: 'Acumulado do ano',
+}
+
 # --- Verificação de Autenticação ---
-if not st.session_state.get('authenticated', False):
-    st.warning('🔒 Acesso negado. Por favor, faça login para visualizar esta página.')
-    st.stop()
+require_authentication()
 
 
 # --- Page configuration ---
-st.subheader('📊 Receita Anual por Cliente')
+st.subheader(f'📊 {ANNUAL_REVENUE_PER_CUSTOMER.title}')
 
 # --- Inputs ---
 st.sidebar.header('Filtros do Relatório')
 
 current_year = datetime.date.today().year
-min_years = 3
-max_years = 5
 
 years_to_display = st.sidebar.slider(
     'Selecione o número de anos para análise:',
-    min_value=min_years,
-    max_value=max_years,
+    min_value=get_settings().revenue.min_years,
+    max_value=get_settings().revenue.max_years,
     step=1,
 )
 
@@ -38,59 +60,275 @@ selected_years = list(range(start_year, end_year + 1))
 
 st.markdown(f'Este relatório mostra a receita anual por cliente para os anos {", ".join(map(str, selected_years))}.')
 
-# country_options = CountryService().fetch_countries(country=None)
+country_options = CountryService.fetch_countries(country=None)
+
+selected_countries = st.sidebar.multiselect(
+    'Selecione os países (deixe em branco para todos):',
+    options=list(country_options),
+    format_func=lambda code: f'{code} - {country_options.get(code, "")}',
+    default=[],
+)
 
-# selected_countries = st.sidebar.multiselect(
-#     'Selecione os países (deixe em branco para todos):',
-#     options=country_options,
-#     default=[],
-# )
+report_params = (start_year, end_year, tuple(sorted(selected_countries)))
+
+# --- Built reports, kept in the session by parameters ---
+# Every rerun of the page finds the report of the selected parameters here, without running the
+# pipeline again; the table, ranking and export below rerun as fragments, without the page,
+# each fragment rerun traced and profiled on its own.
+reports = st.session_state.setdefault(REPORT_STATE_KEY, {})
 
 # --- Report Generate Button and Main Logic ---
 if st.sidebar.button('Gerar Relatório', key='generate_report_button'):
-    revenue = AnnualRevenueService()
-    customer = CustomerService()
+    # A new build replaces the report of the same parameters
+    reports.pop(report_params, None)
 
-    with st.spinner('Buscar lista de clientes...'):
-        customers = customer.fetch_raw_customers(filter=None)
+    # Invoices and credits are loaded concurrently by the report runtime
+    try:
+        with st.spinner('Buscar dados...'):
+            result = ReportRuntime.run(
+                ANNUAL_REVENUE_PER_CUSTOMER,
+                params={'start_year': start_year, 'end_year': end_year, 'countries': selected_countries or None},
+            )
+    except RuntimeError as e:
+        # The services raise on database failures, showing them is up to the page
+        st.error(str(e))
+    else:
+        if result.output is None:
+            st.info('Nenhum dado encontrado para os parâmetros selecionados.')
+        else:
+            # Keep the monthly data on the server, every view is derived from it without a new query
+            reports[report_params] = {**result.output}
 
-    with st.spinner('Buscar dados...'):
-        revenue_invoices = revenue.fetch_revenue_data(start_year=start_year, end_year=end_year, invoice_type=1)
-        revenue_credits = revenue.fetch_revenue_data(start_year=start_year, end_year=end_year, invoice_type=2)
+            # The least recently built reports are dropped first
+            while len(reports) > get_settings().reports.session_max_entries:
+                reports.pop(next(iter(reports)))
 
-    if revenue_invoices.empty and revenue_credits.empty:
-        st.info('Nenhum dado encontrado para os parâmetros selecionados.')
-    else:
-        # Create comparison tables
-        with st.spinner('Montar visualização...'):
-            df_invoices = {}
-            df_credits = {}
 
-            # Create a DataFrame for each year with the corresponding invoices and credits
-            df_invoices, df_credits = revenue.split_revenue_by_year(
-                invoices=revenue_invoices, credits=revenue_credits, start_year=start_year, end_year=end_year
+def render_export(df_report: pd.DataFrame, positions: np.ndarray, file_stem: str):
+    """
+    Export of a report view, in the order of the given row positions. Runs in the table fragment.
+    """
+    with st.expander('Exportar relatório'):
+        col_format, col_prepare = st.columns([3, 1])
+        export_format = col_format.selectbox('Formato', options=list(EXPORT_FORMATS), key='report_export_format')
+
+        if col_prepare.button('Preparar ficheiro', key='report_export_button'):
+            file_format = EXPORT_FORMATS[export_format]
+            column_names = [annual_revenue_column_label(column) for column in df_report.columns]
+
+            with (
+                st.spinner('Exportar dados...'),
+                span('report.export', format=export_format),
+                tempfile.TemporaryFile() as export_file,
+            ):
+                export_report(df_report, export_format, column_names, sink=export_file, positions=positions)
+                export_file.seek(0)
+                # st.download_button keeps its data whole in the media file storage and accepts no
+                # stream, so the peak memory of a download is still the file size; the chunked
+                # export only bounds the memory used while the file is written
+                export_data = export_file.read()
+
+            st.download_button(
+                'Descarregar',
+                data=export_data,
+                file_name=f'{file_stem}.{file_format.extension}',
+                mime=file_format.mimetype,
+                key='report_export_download',
             )
 
-            # Leave both DataFrames with same number of rows
-            df_equalized = revenue.merge_and_equalize_by_year(df_invoices, df_credits)
 
-        if len(df_equalized) > 0:
-            df_show = revenue.create_final_report(df_equalized, customers)
+@traced_fragment('report_table')
+def render_table(view: dict, df_report: pd.DataFrame, view_years: tuple[int, ...], granularity: ReportGranularity):
+    """
+    Search, sort, pagination and export of a report view. Reruns alone when its widgets change.
+    """
+    col_search, col_sort, col_order, col_size = st.columns([3, 3, 1, 1])
 
-            if not df_show.empty:
-                config_columns = config_columns_to_annual_revenue()
+    search_text = col_search.text_input('Pesquisar cliente', placeholder='Código ou nome', key='report_search')
+    sort_column = col_sort.selectbox(
+        'Ordenar por',
+        options=[None, *df_report.columns],
+        format_func=annual_revenue_column_label,
+        key='report_sort_column',
+    )
+    sort_order = col_order.selectbox('Ordem', options=['Asc', 'Desc'], key='report_sort_order')
+    page_size = col_size.selectbox('Linhas', options=PAGE_SIZES, key='report_page_size')
 
-                # Adjust table height based on number of rows
-                table_height = adjust_table_height(len(df_show))
+    with span('view.search_sort', search=bool(search_text), sort=str(sort_column)):
+        positions = view['search_index'].search(search_text)
+        positions = sort_positions(df_report, positions, sort_column, ascending=sort_order == 'Asc')
 
-                st.dataframe(
-                    df_show,
-                    hide_index=True,
-                    height=table_height,
-                    column_config=config_columns,
-                    use_container_width=True,
-                )
-            else:
-                st.info('Nenhum dado encontrado para os parâmetros selecionados.')
-        else:
-            st.info('Nenhum dado encontrado para os parâmetros selecionados.')
+    page = st.number_input(
+        'Página', min_value=1, max_value=page_count(len(positions), page_size), value=1, key='report_page'
+    )
+    window = paginate(df_report, positions, page=int(page), page_size=page_size)
+
+    with span('render.table', rows=len(window.frame)):
+        st.dataframe(
+            window.frame,
+            hide_index=True,
+            height=adjust_table_height(len(window.frame)),
+            column_config=config_columns_to_annual_revenue(),
+            use_container_width=True,
+        )
+    st.caption(
+        f'A mostrar {window.first_row}-{window.last_row} de {window.total_rows} clientes '
+        f'(página {window.page} de {window.pages}).'
+    )
+
+    # --- Export (streamed in chunks, in the current search and sort order) ---
+    render_export(df_report, positions, file_stem=f'receita_{granularity}_{"_".join(map(str, view_years))}')
+
+
+@traced_fragment('report_ranking')
+def render_ranking(view: dict, periods: list[str]):
+    """
+    Top customers and Pareto (ABC) classification of a report view. Reruns alone when its widgets change.
+    """
+    with st.expander('Top clientes e classificação ABC'):
+        col_period, col_top = st.columns([3, 1])
+        ranking_period = col_period.selectbox(
+            'Período', options=periods, index=len(periods) - 1, key='report_ranking_period'
+        )
+        top_n = col_top.number_input('Número de clientes', min_value=1, max_value=1000, value=50, key='report_top_n')
+
+        # Only the top slice is sorted, the remaining customers come aggregated in one row
+        rankings = view.setdefault('rankings', {})
+        ranking = rankings.get((ranking_period, top_n))
+
+        if ranking is None:
+            ranking = AnnualRevenueService.rank_customers(view['frame'], period=ranking_period, top_n=int(top_n))
+            rankings[(ranking_period, top_n)] = ranking
+
+        class_columns = st.columns(len(ranking.class_counts))
+        for column, (label, count) in zip(class_columns, ranking.class_counts.items()):
+            column.metric(f'Classe {label}', f'{count} clientes', help=f'{count / max(ranking.customers, 1):.1%}')
+
+        st.dataframe(
+            ranking.top_rows,
+            hide_index=True,
+            height=adjust_table_height(len(ranking.top_rows)),
+            column_config=config_columns_to_customer_ranking(),
+            use_container_width=True,
+        )
+
+
+def render_comparison(view: dict, periods: list[str]) -> pd.DataFrame:
+    """
+    Totals and averages of two periods of a report view, and their variation.
+    Returns:
+        pd.DataFrame: The view widened by the per-customer variation columns.
+    """
+    col_previous, col_current = st.columns(2)
+    previous = col_previous.selectbox(
+        'Período anterior', options=periods, index=len(periods) - 2, key='report_compare_previous'
+    )
+    current = col_current.selectbox(
+        'Período atual', options=periods, index=len(periods) - 1, key='report_compare_current'
+    )
+
+    # Each comparison is computed once per view, with the report widened by its variation columns
+    comparisons = view.setdefault('comparisons', {})
+
+    if (previous, current) not in comparisons:
+        comparison = AnnualRevenueService.compare_periods(view['frame'], previous=previous, current=current)
+        comparisons[(previous, current)] = {
+            'data': comparison,
+            'frame': pd.concat([view['frame'], comparison.comparison_rows], axis=1),
+        }
+
+    comparison = comparisons[(previous, current)]['data']
+
+    total_delta = f'{comparison.var_total_sales_copies["Balance"]:,.2f}'
+    avg_delta = f'{comparison.var_avg_sales_copies["Balance"]:,.2f}'
+
+    col_total_prev, col_total_curr, col_avg_prev, col_avg_curr = st.columns(4)
+    col_total_prev.metric(f'Saldo {previous}', f'{comparison.total_prev["Balance"]:,.2f}')
+    col_total_curr.metric(
+        f'Saldo {current}',
+        f'{comparison.total_curr["Balance"]:,.2f}',
+        delta=f'{total_delta} ({comparison.var_total_sales_perc["Balance"]:.1f}%)',
+    )
+    col_avg_prev.metric(f'Média por cliente {previous}', f'{comparison.avg_prev["Balance"]:,.2f}')
+    col_avg_curr.metric(
+        f'Média por cliente {current}',
+        f'{comparison.avg_curr["Balance"]:,.2f}',
+        delta=f'{avg_delta} ({comparison.var_avg_sales_perc["Balance"]:.1f}%)',
+    )
+
+    return comparisons[(previous, current)]['frame']
+
+
+@traced_fragment('report_view')
+def render_report(report: dict, years: list[int]):
+    """
+    Views of a built report: granularity, period comparison, table and ranking.
+    Reruns alone when the view changes, its table and ranking fragments rerun with it.
+    """
+    first_year, last_year = years[0], years[-1]
+    col_granularity, col_year = st.columns([3, 1])
+
+    granularity = col_granularity.radio(
+        'Visualização',
+        options=list(GRANULARITY_LABELS),
+        format_func=GRANULARITY_LABELS.get,
+        horizontal=True,
+        key='report_granularity',
+    )
+
+    # Quarters and months are drilled down from one year, or shown for every year
+    drill_year = None
+    if granularity in {ReportGranularity.QUARTER, ReportGranularity.MONTH}:
+        drill_year = col_year.selectbox(
+            'Ano',
+            options=[None, *reversed(years)],
+            index=1,
+            format_func=lambda year: 'Todos' if year is None else str(year),
+            key='report_drill_year',
+        )
+
+    view_key = (granularity, drill_year)
+    view = report['views'].get(view_key)
+
+    if view is None:
+        # Each view is built once per report, from the cached monthly data
+        with st.spinner('Montar visualização...'):
+            df_view = AnnualRevenueService.build_final_report(
+                invoices=report['invoices'],
+                credits=report['credits'],
+                customers=None,  # names come with the revenue data
+                start_year=drill_year or first_year,
+                end_year=drill_year or last_year,
+                granularity=granularity,
+            )
+            # The search index is built once per view, searching only looks it up
+            view = {
+                'frame': df_view,
+                'search_index': CustomerSearchIndex(
+                    codes=df_view[('Info', 'Customer')], names=df_view[('Info', 'Name')]
+                ),
+            }
+        report['views'][view_key] = view
+
+    df_report = view['frame']
+
+    # --- Period comparison (totals, averages and per-customer variation) ---
+    periods = list(dict.fromkeys(group for group, _ in df_report.columns if group != 'Info'))
+
+    if len(periods) > 1 and st.toggle('Comparar períodos', key='report_compare'):
+        df_report = render_comparison(view, periods)
+
+    if granularity is ReportGranularity.YTD:
+        st.caption(f'Valores acumulados de janeiro até ao mês {datetime.date.today().month} de cada ano.')
+
+    view_years = (drill_year,) if drill_year else (first_year, last_year)
+
+    render_table(view, df_report, view_years=view_years, granularity=granularity)
+    render_ranking(view, periods)
+
+
+# --- Report Table (server-side search, sort and pagination) ---
+report = reports.get(report_params)
+
+if report:
+    render_report(report, selected_years)
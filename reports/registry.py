@@ -0,0 +1,157 @@
+import datetime
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from config.settings import get_settings
+from utils.local_menus import Chapter645
+
+# The registry is imported by main.py to build the navigation, so it must stay light:
+# the services (pandas, SQLAlchemy) are imported by the loaders, when a report runs
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    How the runtime caches a dataset.
+    Args:
+        ttl (float, optional): Time to live in seconds, None to keep until invalidated.
+        memory (bool): Whether the dataset is cached in memory (utils.result_cache).
+        disk (bool): Whether the dataset is cached on disk, shared between processes.
+        single_flight (bool): Whether identical concurrent loads are coalesced.
+    """
+
+    ttl: Optional[float] = field(default_factory=lambda: get_settings().reports.default_ttl)
+    memory: bool = True
+    disk: bool = True
+    single_flight: bool = True
+
+
+# For loaders that already manage their own caching
+NO_CACHE = CachePolicy(ttl=None, memory=False, disk=False, single_flight=False)
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """
+    A dataset loaded by a report.
+    Args:
+        name (str): Name of the dataset, unique in the report.
+        loader (Callable): Module-level function returning a DataFrame, called with the parameters.
+        params (tuple[str, ...], optional): Report parameters passed to the loader, None for all.
+        cache (CachePolicy): Cache policy of the dataset, cached with the defaults if not given.
+    """
+
+    name: str
+    loader: Callable[..., 'pd.DataFrame']
+    params: Optional[tuple[str, ...]] = None
+    cache: CachePolicy = field(default_factory=CachePolicy)
+
+
+@dataclass(frozen=True)
+class ReportDefinition:
+    """
+    Declaration of a report: its page, the datasets it loads and how they are transformed.
+    Args:
+        key (str): Unique key of the report.
+        title (str): Title of the report page.
+        icon (str): Icon of the report page.
+        page (str): Path of the page script.
+        datasets (tuple[Dataset, ...]): Datasets loaded concurrently by the runtime.
+        transform (Callable, optional): Called with the loaded datasets and the parameters,
+            its result is the output of the report. None returns the datasets as they are.
+        standard_params (Callable, optional): Returns the parameter sets precomputed by the
+            worker, None if the report is not precomputed.
+        version (int): Format version of the precomputed datasets, bump it when their shape changes.
+    """
+
+    key: str
+    title: str
+    icon: str
+    page: str
+    datasets: tuple[Dataset, ...]
+    transform: Optional[Callable[..., Any]] = None
+    standard_params: Optional[Callable[[], list[dict[str, Any]]]] = None
+    version: int = 1
+
+
+REPORTS: dict[str, ReportDefinition] = {}
+
+
+def register(report: ReportDefinition) -> ReportDefinition:
+    """
+    Adds a report to the registry, making it available in the navigation.
+    """
+    if report.key in REPORTS:
+        raise ValueError(f'Relatório já registado: {report.key}')
+
+    REPORTS[report.key] = report
+
+    return report
+
+
+def get_report(key: str) -> ReportDefinition:
+    """
+    Returns a registered report by its key.
+    """
+    return REPORTS[key]
+
+
+# --- Annual revenue per customer ---
+
+
+def _load_revenue_invoices(start_year: int, end_year: int, countries: Optional[list[str]]) -> 'pd.DataFrame':
+    from services.annual_revenue_service import AnnualRevenueService  # noqa: PLC0415
+
+    return AnnualRevenueService.fetch_revenue_data(
+        start_year=start_year, end_year=end_year, invoice_type=Chapter645.INVOICE.value, countries=countries
+    )
+
+
+def _load_revenue_credits(start_year: int, end_year: int, countries: Optional[list[str]]) -> 'pd.DataFrame':
+    from services.annual_revenue_service import AnnualRevenueService  # noqa: PLC0415
+
+    return AnnualRevenueService.fetch_revenue_data(
+        start_year=start_year, end_year=end_year, invoice_type=Chapter645.CREDIT_NOTE.value, countries=countries
+    )
+
+
+def _prepare_revenue(datasets: dict[str, 'pd.DataFrame'], **params) -> Optional[dict[str, Any]]:
+    """
+    Keeps the monthly revenue data, every view of the report is derived from it on the page.
+    """
+    if datasets['invoices'].empty and datasets['credits'].empty:
+        return None
+
+    return {'invoices': datasets['invoices'], 'credits': datasets['credits'], 'views': {}}
+
+
+def _revenue_standard_params() -> list[dict[str, Any]]:
+    """
+    Parameter sets offered by default on the page: each range of years ending in the current year, all countries.
+    """
+    settings = get_settings().revenue
+    end_year = datetime.date.today().year
+
+    return [
+        {'start_year': end_year - (years - 1), 'end_year': end_year, 'countries': None}
+        for years in range(settings.min_years, settings.max_years + 1)
+    ]
+
+
+ANNUAL_REVENUE_PER_CUSTOMER = register(
+    ReportDefinition(
+        key='annual_revenue_per_customer',
+        title='Receita Anual por Cliente',
+        icon=':material/bar_chart:',
+        page='reports/annual_revenue_per_customer.py',
+        datasets=(
+            # The revenue service caches closed and open years with their own policies
+            Dataset(name='invoices', loader=_load_revenue_invoices, cache=NO_CACHE),
+            Dataset(name='credits', loader=_load_revenue_credits, cache=NO_CACHE),
+        ),
+        transform=_prepare_revenue,
+        standard_params=_revenue_standard_params,
+    )
+)
@@ -0,0 +1,219 @@
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, NamedTuple, Optional
+
+import pandas as pd
+
+from config.settings import get_settings
+from reports.registry import Dataset, ReportDefinition
+from utils.disk_cache import disk_cache
+from utils.profiling import run_thread_prefix
+from utils.result_cache import result_cache
+from utils.single_flight import single_flight
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class ReportResult(NamedTuple):
+    params: dict[str, Any]
+    datasets: dict[str, pd.DataFrame]
+    output: Any
+    timings: dict[str, float]
+    precomputed: bool
+
+
+class ReportRuntime:
+    """
+    Shared runtime of the reports declared in the registry.
+    The datasets of a report are loaded concurrently, each one through the caches of its
+    policy (memory, disk and single-flight), and every stage is timed and logged.
+    Datasets precomputed by the worker (worker.py) are read first, the live load is only
+    the fallback on a miss.
+    The runtime does not depend on Streamlit, it is shared by the pages and the worker.
+    """
+
+    _lock = threading.Lock()
+    _loaders: dict[tuple[str, str], Callable[..., pd.DataFrame]] = {}
+
+    def __init__(self):
+        pass
+
+    @classmethod
+    def _loader(cls, report: ReportDefinition, dataset: Dataset) -> Callable[..., pd.DataFrame]:
+        """
+        Returns the loader of a dataset wrapped by its cache policy, built once per process.
+        """
+        key = (report.key, dataset.name)
+
+        with cls._lock:
+            loader = cls._loaders.get(key)
+
+            if loader is None:
+                loader = dataset.loader
+                policy = dataset.cache
+                namespace = f'report_{report.key}_{dataset.name}'
+
+                # Same order as the services: memory, then single-flight, then disk
+                if policy.disk:
+                    loader = disk_cache.cached(namespace=namespace, ttl=policy.ttl)(loader)
+                if policy.single_flight:
+                    loader = single_flight.coalesce(namespace=namespace)(loader)
+                if policy.memory:
+                    loader = result_cache.cached(namespace=namespace, ttl=policy.ttl)(loader)
+
+                cls._loaders[key] = loader
+
+        return loader
+
+    @staticmethod
+    def _dataset_params(dataset: Dataset, params: dict[str, Any]) -> dict[str, Any]:
+        if dataset.params is None:
+            return params
+
+        return {name: params[name] for name in dataset.params}
+
+    @classmethod
+    def load(cls, report: ReportDefinition, params: dict[str, Any]) -> tuple[dict[str, pd.DataFrame], dict[str, float]]:
+        """
+        Loads the datasets of a report concurrently.
+        Args:
+            report (ReportDefinition): Report to load.
+            params (dict[str, Any]): Parameters of the report.
+        Returns:
+            tuple: The datasets by name and the load time of each one, in seconds.
+        """
+
+        def load_dataset(dataset: Dataset) -> tuple[pd.DataFrame, float]:
+            started = time.perf_counter()
+
+            with span(f'dataset.{dataset.name}') as current:
+                df = cls._loader(report, dataset)(**cls._dataset_params(dataset, params))
+                if current is not None:
+                    current.set(rows=len(df))
+
+            return df, time.perf_counter() - started
+
+        workers = max(1, min(get_settings().reports.loader_workers, len(report.datasets)))
+
+        # Named after the profiled run, if any, so its sampler only samples the loaders of this run
+        thread_prefix = run_thread_prefix(f'report-{report.key}')
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=thread_prefix) as executor:
+            # Each loader runs in a copy of the caller context, so its spans join the current trace
+            futures = {
+                dataset.name: executor.submit(contextvars.copy_context().run, load_dataset, dataset)
+                for dataset in report.datasets
+            }
+            results = {name: future.result() for name, future in futures.items()}
+
+        datasets = {name: df for name, (df, _) in results.items()}
+        timings = {name: elapsed for name, (_, elapsed) in results.items()}
+
+        return datasets, timings
+
+    @staticmethod
+    def _precomputed_namespace(report: ReportDefinition) -> str:
+        return f'precomputed_{report.key}'
+
+    @staticmethod
+    def _precomputed_params(report: ReportDefinition, dataset: str, params: dict[str, Any]) -> dict[str, Any]:
+        # The version is part of the key, datasets written in another format are never read
+        return {'version': report.version, 'dataset': dataset, **params}
+
+    @classmethod
+    def load_precomputed(cls, report: ReportDefinition, params: dict[str, Any]) -> Optional[dict[str, pd.DataFrame]]:
+        """
+        Reads the datasets of a report precomputed by the worker.
+        Args:
+            report (ReportDefinition): Report to read.
+            params (dict[str, Any]): Parameters of the report.
+        Returns:
+            Optional[dict[str, pd.DataFrame]]: The datasets by name, or None unless all of them are available.
+        """
+        if not get_settings().precompute.enabled:
+            return None
+
+        datasets = {}
+
+        for dataset in report.datasets:
+            df = disk_cache.get(
+                cls._precomputed_namespace(report), cls._precomputed_params(report, dataset.name, params)
+            )
+            if df is None:
+                return None
+            datasets[dataset.name] = df
+
+        return datasets
+
+    @classmethod
+    def invalidate_precomputed(cls, report: ReportDefinition) -> None:
+        """
+        Removes the precomputed datasets of a report, the dashboard loads them live until the worker runs again.
+        Args:
+            report (ReportDefinition): Report to invalidate.
+        """
+        disk_cache.invalidate(namespace=cls._precomputed_namespace(report))
+
+    @classmethod
+    def precompute(cls, report: ReportDefinition, params: dict[str, Any]) -> dict[str, float]:
+        """
+        Loads the datasets of a report and stores them for the dashboard, used by the worker.
+        Args:
+            report (ReportDefinition): Report to precompute.
+            params (dict[str, Any]): Parameters of the report.
+        Returns:
+            dict[str, float]: The load time of each dataset, in seconds.
+        """
+        datasets, timings = cls.load(report, params)
+
+        for name, df in datasets.items():
+            disk_cache.put(
+                cls._precomputed_namespace(report),
+                cls._precomputed_params(report, name, params),
+                df,
+                ttl=get_settings().precompute.ttl,
+            )
+
+        return timings
+
+    @classmethod
+    def run(cls, report: ReportDefinition, params: dict[str, Any]) -> ReportResult:
+        """
+        Loads the datasets of a report and applies its transform.
+        Args:
+            report (ReportDefinition): Report to run.
+            params (dict[str, Any]): Parameters of the report.
+        Returns:
+            ReportResult: The datasets, the output of the transform and the time of each stage.
+        """
+        started = time.perf_counter()
+
+        with span('report.load', report=report.key) as current:
+            datasets = cls.load_precomputed(report, params)
+            precomputed = datasets is not None
+
+            if precomputed:
+                timings = {}
+            else:
+                datasets, timings = cls.load(report, params)
+
+            if current is not None:
+                current.set(precomputed=precomputed)
+
+        timings['load'] = time.perf_counter() - started
+
+        transform_started = time.perf_counter()
+        with span('report.transform', report=report.key):
+            output = report.transform(datasets, **params) if report.transform else datasets
+        timings['transform'] = time.perf_counter() - transform_started
+        timings['total'] = time.perf_counter() - started
+
+        stages = ', '.join(f'{name}: {elapsed:.3f}s' for name, elapsed in timings.items())
+        source = 'pré-calculado' if precomputed else 'carregamento'
+        logger.info(f'Relatório {report.key} executado ({source}; {stages})')
+
+        return ReportResult(params=params, datasets=datasets, output=output, timings=timings, precomputed=precomputed)
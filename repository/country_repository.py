@@ -1,8 +1,9 @@
 import logging
 from typing import Optional
 
-from database.database import db
+from database.database import get_db_manager
 from database.database_core import DatabaseCoreManager
+from utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -13,15 +14,16 @@ class CountryRepository:
     """
 
     def __init__(self):
-        self.db = db
+        self.db = get_db_manager()
 
-    def fetch_countries(self, country: Optional[list[str]]) -> list[str]:
+    @traced('repository.countries')
+    def fetch_countries(self, country: Optional[list[str]]) -> dict[str, str]:
         db_core = DatabaseCoreManager(db_manager=self.db)
 
         query_params = {
             'table': f'{db_core.schema}.ZTABCOUNTRY',
             'columns': ['CRY_0', 'CRYDES_0'],
-            'order_by': ['CRY_0'],
+            'options': {'order_by': 'CRY_0'},
         }
 
         if isinstance(country, list) and len(country) > 0:
@@ -30,7 +32,7 @@ class CountryRepository:
 
         result = db_core.execute_query(**query_params)
 
-        countries = []
+        countries = {}
 
         if result is None or result['status'] != 'success':
             logger.error('Erro ao consultar o banco de dados. Verifique os logs para mais detalhes.')
@@ -41,6 +43,6 @@ class CountryRepository:
             return countries
 
         for data in result['data']:
-            countries.append(data.get('CRYDES_0', ''))
+            countries[data.get('CRY_0', '')] = data.get('CRYDES_0', '')
 
         return countries
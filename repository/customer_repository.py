@@ -1,8 +1,9 @@
 import logging
 from typing import Optional
 
-from database.database import db
+from database.database import get_db_manager
 from database.database_core import DatabaseCoreManager
+from utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -13,8 +14,9 @@ class CustomerRepository:
     """
 
     def __init__(self):
-        self.db = db
+        self.db = get_db_manager()
 
+    @traced('repository.customers')
     def fetch_raw_customers(self, filter: Optional[list[str]]) -> list[dict[str, str]]:
         db_core = DatabaseCoreManager(db_manager=self.db)
 
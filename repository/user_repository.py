@@ -1,16 +1,34 @@
+import decimal
 import logging
+from dataclasses import dataclass
 from typing import Any, Optional
 
-import streamlit as st
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
-from database.database import db
+from database.database import get_db_manager
 from database.database_core import DatabaseCoreManager
 from models.users import Users
+from utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# Sage X3 local menu 1 (Não/Sim)
+ENABLED_FLAG = 2
+
+
+@dataclass(frozen=True)
+class UserCredentials:
+    """
+    Projection of AUTILIS used by the login: the user, its enabled flag and its password hash.
+    """
+
+    id: decimal.Decimal
+    username: str
+    name: str
+    password_hash: str
+    enabled: bool
+
 
 class UserRepository:
     """
@@ -18,8 +36,9 @@ class UserRepository:
     """
 
     def __init__(self):
-        self.db = db
+        self.db = get_db_manager()
 
+    @traced('repository.user_by_username')
     def get_by_username(self, username: str) -> Optional[Users]:
         """
         Retrieves user information by username.
@@ -50,37 +69,94 @@ class UserRepository:
 
         return None
 
-    def set_user_password(self, user: Users, new_password_hash: str) -> bool:
+    @traced('repository.user_credentials')
+    def get_credentials(self, username: str) -> Optional[UserCredentials]:
+        """
+        Retrieves the login projection of a user: five columns read through the unique USR_0 index,
+        instead of the whole AUTILIS row.
+        :param username: Username of the user
+        :return: The credentials of the user, None if not found or on error
+        """
+        if not self.db:
+            logger.error('Database connection is not established.')
+            return None
+
+        if not username:
+            logger.error('Username is empty or None.')
+            return None
+
+        try:
+            with self.db.get_db() as session:
+                stmt = select(Users.id, Users.username, Users.name, Users.password, Users.ENAFLG_0).where(
+                    Users.username == username.upper()
+                )
+
+                row = session.execute(stmt).one_or_none()
+        except Exception as e:
+            logger.error(f'Error retrieving credentials of user {username}: {e}', exc_info=True)
+            return None
+
+        if row is None:
+            return None
+
+        return UserCredentials(
+            id=row.id,
+            username=row.username,
+            name=row.name,
+            password_hash=str(row.password or '').strip(),
+            enabled=row.ENAFLG_0 == ENABLED_FLAG,
+        )
+
+    @traced('repository.user_password_hash')
+    def get_password_hash(self, user_id: decimal.Decimal) -> Optional[str]:
+        """
+        Retrieves the password hash of a user by its ROWID.
+        :param user_id: ROWID of the user
+        :return: The password hash, an empty string if none is set, None if not found or on error
+        """
+        if not self.db:
+            logger.error('Database connection is not established.')
+            return None
+
+        try:
+            with self.db.get_db() as session:
+                password = session.execute(select(Users.password).where(Users.id == user_id)).scalar_one_or_none()
+        except Exception as e:
+            logger.error(f'Error retrieving password hash of user_id {user_id}: {e}', exc_info=True)
+            return None
+
+        return None if password is None else str(password).strip()
+
+    def set_user_password(self, user_id: decimal.Decimal, new_password_hash: str) -> bool:
         """
-        Sets or updates the user's password hash in the database.
-        :param user_id: ID of the user.
+        Sets or updates the user's password hash in the database, updating only YPWDHASH_0
+        (and the update timestamp) of the row.
+        :param user_id: ROWID of the user.
         :param new_password_hash: The new hashed password.
         :return: True if successful, False otherwise.
         """
         if not self.db:
             logger.error('Database connection is not established.')
-            st.error('Gerenciador do banco não disponível.')
             return False
 
         if not new_password_hash:
             logger.warning('Nenhuma cláusula SET gerada para a query de atualização.')
             return False
 
-        user.password = new_password_hash
-
-        logger.info(f'Attempting to set password for user_id: {user.username}')
+        logger.info(f'Attempting to set password for user_id: {user_id}')
         try:
             with self.db.get_db() as session:
-                update_user = self.update_control(db=session, user_data=user)
+                result = session.execute(update(Users).where(Users.id == user_id).values(password=new_password_hash))
+                session.commit()
 
-                if not update_user:
-                    logger.warning(f'User with ID {user.username} not found for password update.')
+                if result.rowcount == 0:
+                    logger.warning(f'User with ID {user_id} not found for password update.')
                     return False
 
-                logger.info(f'Password updated successfully for user: {user.username}')
+                logger.info(f'Password updated successfully for user_id: {user_id}')
                 return True
         except Exception as e:
-            logger.error(f'Error retrieving user by username {user.username}: {e}', exc_info=True)
+            logger.error(f'Error updating the password of user_id {user_id}: {e}', exc_info=True)
             return False
 
     @staticmethod
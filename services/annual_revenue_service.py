@@ -1,17 +1,41 @@
+import datetime
 import logging
+from enum import StrEnum
+from typing import Any, Optional
 
+import numpy as np
 import pandas as pd
-import streamlit as st
 
-from config.settings import DATABASE
-from database.database import db
+from config.settings import get_settings
+from database.database import get_db_manager
 from database.database_core import DatabaseCoreManager
+from utils.comparison_table_data import ComparisonTableData, CustomerRankingData
+from utils.disk_cache import disk_cache
 from utils.local_menus import Chapter645
-
-# from utils.comparison_table_data import equalize_rows
+from utils.result_cache import result_cache
+from utils.single_flight import single_flight
+from utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# Measures of each year in the report, in display order
+REPORT_MEASURES = ('Amount_invoice', 'Amount_credit', 'Balance')
+
+# Maximum rounding error accepted when storing amounts in a compact dtype
+AMOUNT_TOLERANCE = 0.005
+
+# Pareto (ABC) classes by the cumulative share of revenue they reach, in percent
+PARETO_CLASS_LIMITS = (('A', 80.0), ('B', 95.0), ('C', 100.0))
+
+
+class ReportGranularity(StrEnum):
+    """Periods of the revenue report columns, all derived from the monthly data"""
+
+    YEAR = 'year'
+    QUARTER = 'quarter'
+    MONTH = 'month'
+    YTD = 'ytd'
+
 
 class AnnualRevenueService:
     """
@@ -22,57 +46,183 @@ class AnnualRevenueService:
         pass
 
     @staticmethod
-    @st.cache_data(ttl=600)
-    def fetch_revenue_data(start_year: int, end_year: int, invoice_type: int) -> pd.DataFrame:  # noqa: PLR6301
+    def is_closed_year(year: int, today: Optional[datetime.date] = None) -> bool:
+        """
+        Checks if a year is closed, i.e. no more postings are expected for it.
+        A year is considered closed once the grace period after its last day has elapsed.
+        Args:
+            year (int): Year to check.
+            today (datetime.date, optional): Reference date, defaults to today.
+        Returns:
+            bool: True if the year is closed, False otherwise.
+        """
+        today = today or datetime.date.today()
+        grace_days = get_settings().revenue.closed_year_grace_days
+        closing_date = datetime.date(year, 12, 31) + datetime.timedelta(days=grace_days)
+
+        return today > closing_date
+
+    @staticmethod
+    @traced('revenue.fetch', params=('start_year', 'end_year', 'invoice_type'))
+    def fetch_revenue_data(
+        start_year: int, end_year: int, invoice_type: int, countries: Optional[list[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Fetches monthly revenue data for the years interval, stitching closed and open years.
+        Closed years are cached until explicitly invalidated, while the open period is
+        cached with a short TTL, so a refresh only queries the years that can still change.
+        The data is kept at month grain, so every report view (annual, quarterly, monthly
+        or year-to-date) is derived from it by build_final_report without a new query.
+        Args:
+            start_year (int): Start year for the data.
+            end_year (int): End year for the data.
+            invoice_type (int): Type of invoice to filter the data.
+            countries (list[str], optional): Country codes of the customers, None or empty for all.
+        Returns:
+            pd.DataFrame: DataFrame with Year, Month, Customer, Name and Amount columns.
+        Raises:
+            RuntimeError: If the database is not available or a query fails.
+        """
+        if invoice_type not in Chapter645._value2member_map_:
+            logger.error(f'Tipo de fatura inválido: {invoice_type}.')
+            return pd.DataFrame()
+
+        # Canonical form, so the same set of countries always hits the same cache entries
+        countries = sorted({c.upper() for c in countries if isinstance(c, str)}) if countries else None
+
+        frames = []
+
+        # Failures are raised by the cached loaders so that they are never cached, the caller reports them
+        for year in range(start_year, end_year + 1):
+            if AnnualRevenueService.is_closed_year(year):
+                df = AnnualRevenueService._fetch_closed_year(year=year, invoice_type=invoice_type, countries=countries)
+            else:
+                df = AnnualRevenueService._fetch_open_year(year=year, invoice_type=invoice_type, countries=countries)
+
+            if not df.empty:
+                frames.append(df)
+
+        if not frames:
+            return pd.DataFrame()
+
+        return pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def invalidate_closed_years() -> None:
+        """
+        Clears the cached data of the closed years, forcing them to be queried again.
+        The datasets precomputed by the worker hold the closed years too, they are cleared with them.
+        """
+        # Imported here, the report registry loads this service lazily from its loaders
+        from reports.registry import ANNUAL_REVENUE_PER_CUSTOMER  # noqa: PLC0415
+        from reports.runtime import ReportRuntime  # noqa: PLC0415
+
+        AnnualRevenueService._fetch_closed_year.clear()
+        disk_cache.invalidate(namespace='revenue_closed_year')
+        ReportRuntime.invalidate_precomputed(ANNUAL_REVENUE_PER_CUSTOMER)
+        logger.info('Cache dos anos fechados invalidado.')
+
+    @staticmethod
+    @traced('revenue.closed_year', params=('year',))
+    @result_cache.cached(namespace='revenue_closed_year', ttl=None)
+    @single_flight.coalesce(namespace='revenue_closed_year')
+    @disk_cache.cached(namespace='revenue_closed_year', ttl=None, version=3)
+    def _fetch_closed_year(year: int, invoice_type: int, countries: Optional[list[str]] = None) -> pd.DataFrame:
         """
-        Fetches annual revenue data from the database for the years interval and countries.
+        Fetches the revenue data of a closed year, cached until explicitly invalidated.
+        """
+        return AnnualRevenueService._query_revenue_data(
+            start_year=year, end_year=year, invoice_type=invoice_type, countries=countries
+        )
+
+    @staticmethod
+    @traced('revenue.open_year', params=('year',))
+    @result_cache.cached(namespace='revenue_open_year', ttl=get_settings().revenue.open_period_ttl)
+    @single_flight.coalesce(namespace='revenue_open_year')
+    @disk_cache.cached(namespace='revenue_open_year', ttl=get_settings().revenue.open_period_ttl, version=3)
+    def _fetch_open_year(year: int, invoice_type: int, countries: Optional[list[str]] = None) -> pd.DataFrame:
+        """
+        Fetches the revenue data of an open year, cached with a short TTL.
+        """
+        return AnnualRevenueService._query_revenue_data(
+            start_year=year, end_year=year, invoice_type=invoice_type, countries=countries
+        )
+
+    @staticmethod
+    @traced('revenue.query', params=('start_year', 'end_year'))
+    def _query_revenue_data(
+        start_year: int, end_year: int, invoice_type: int, countries: Optional[list[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Queries monthly revenue data from the database for the years interval and countries.
         Args:
             start_year (int): Start year for the data.
             end_year (int): End year for the data.
             invoice_type (int): Type of invoice to filter the data.
+            countries (list[str], optional): Country codes of the customers, None for all.
         Returns:
-            pd.DataFrame: DataFrame containing the annual revenue data.
+            pd.DataFrame: DataFrame with Year, Month, Customer, Name and Amount columns.
+        Raises:
+            RuntimeError: If the database is not available or the query fails.
         """
 
+        db = get_db_manager()
         if not db:  # Verifica se db e seu engine foram inicializados
-            st.error('Gerenciador do banco não disponível.')
             logger.error('Gerenciador do banco não disponível.')
-            return pd.DataFrame()
+            raise RuntimeError('Gerenciador do banco não disponível.')
 
-        schema = DATABASE.get('SCHEMA', None)
+        schema = get_settings().database.schema
         if not schema:
-            st.error('Esquema do banco de dados não definido.')
             logger.error('Esquema do banco de dados não definido.')
-            return pd.DataFrame()
-
-        if invoice_type not in Chapter645._value2member_map_:
-            logger.error(f'Tipo de fatura inválido: {invoice_type}.')
-            return pd.DataFrame()
+            raise RuntimeError('Esquema do banco de dados não definido.')
 
-        logger.info(f'Buscar dados de vendas entre {start_year} e {end_year}')
+        logger.info(f'Buscar dados de vendas entre {start_year} e {end_year} (países: {countries or "todos"})')
 
         db_core = DatabaseCoreManager(db_manager=db)
 
+        where_clauses = {
+            'SIH.INVTYP_0': ('=', invoice_type),
+            'SIH.REVCANSTA_0': ('=', 0),
+            'SIH.ORIMOD_0': ('=', 5),
+            'YEAR(SIH.ACCDAT_0)': ('BETWEEN', (start_year, end_year)),
+        }
+
+        if countries:
+            # Filtering on the joined customer keeps only the invoices of those countries in the aggregate
+            where_clauses['BPC.CRY_0'] = ('IN', list(countries))
+
+        # The customer name is resolved in the same query, so only the names of the
+        # customers with revenue are transferred instead of the whole customer master
         result = db_core.execute_query(
             table=f'{schema}.SINVOICE',
+            table_alias='SIH',
             columns=[
-                'YEAR(ACCDAT_0) AS Year',
-                'BPR_0 AS Customer',
-                'SUM(AMTATI_0) AS Amount',
+                'YEAR(SIH.ACCDAT_0) AS Year',
+                'MONTH(SIH.ACCDAT_0) AS Month',
+                'SIH.BPR_0 AS Customer',
+                'MAX(BPC.BPCNAM_0) AS Name',
+                'SUM(SIH.AMTATI_0) AS Amount',
             ],
-            where_clauses={
-                'INVTYP_0': ('=', invoice_type),
-                'REVCANSTA_0': ('=', 0),
-                'ORIMOD_0': ('=', 5),
-                'YEAR(ACCDAT_0)': ('BETWEEN', (start_year, end_year)),
-            },
+            joins=[
+                {
+                    'type': 'LEFT',
+                    'table': f'{schema}.BPCUSTOMER',
+                    'alias': 'BPC',
+                    'on': 'BPC.BPCNUM_0 = SIH.BPR_0',
+                },
+            ],
+            where_clauses=where_clauses,
             options={
-                'group_by': 'YEAR(ACCDAT_0), BPR_0',
-                'order_by': 'YEAR(ACCDAT_0), BPR_0',
+                'group_by': 'YEAR(SIH.ACCDAT_0), MONTH(SIH.ACCDAT_0), SIH.BPR_0',
+                'order_by': 'YEAR(SIH.ACCDAT_0), MONTH(SIH.ACCDAT_0), SIH.BPR_0',
             },
         )
 
-        if result is None or result['records'] == 0:
+        if result is None or result['status'] != 'success':
+            logger.error('Erro ao consultar o banco de dados. Verifique os logs para mais detalhes.')
+            raise RuntimeError('Erro ao consultar os dados de vendas. Verifique os logs para mais detalhes.')
+
+        if result['records'] == 0:
             logger.warning(
                 f'Nenhum dado encontrado para os parâmetros: '
                 f'Início: {start_year}, Fim: {end_year}, Tipo de Fatura: {invoice_type}'
@@ -245,7 +395,7 @@ class AnnualRevenueService:
 
             yearly_data_df[(year, 'Balance')] = invoice - credit
 
-        columns_order = ['Amount_invoice', 'Amount_credit', 'Balance']
+        columns_order = list(REPORT_MEASURES)
 
         ordered_columns = [(year, column) for year in sorted_years for column in columns_order]
 
@@ -254,3 +404,409 @@ class AnnualRevenueService:
         final_df = pd.concat([customer_info_df, yearly_data_df], axis=1)
 
         return final_df
+
+    @staticmethod
+    def _scatter_amounts(
+        customer_codes: np.ndarray,
+        period_values: np.ndarray,
+        measure_values: np.ndarray,
+        amount_values: np.ndarray,
+        grid: tuple[int, int],
+    ) -> np.ndarray:
+        """
+        Sums the amounts into one (customer, period x measure) block, with the balance of each period.
+        Args:
+            grid (tuple[int, int]): Number of customers and of periods.
+        Returns:
+            np.ndarray: The block, NaN in the cells without any row.
+        """
+        n_measures = len(REPORT_MEASURES)
+        shape = (grid[0], grid[1] * n_measures)
+
+        # One block laid out as (period, measure) columns, filled in one scatter that sums the
+        # months of each period; cells without any row stay NaN
+        cells = np.ravel_multi_index((customer_codes, period_values * n_measures + measure_values), shape)
+        present = np.bincount(cells, minlength=shape[0] * shape[1]) > 0
+
+        if amount_values.dtype.kind in 'iuf':
+            values = np.bincount(cells, weights=amount_values, minlength=shape[0] * shape[1])
+        else:
+            # Decimal amounts are summed exactly
+            values = np.zeros(shape[0] * shape[1], dtype=object)
+            np.add.at(values, cells, amount_values)
+
+        values[~present] = np.nan
+        values = values.reshape(shape)
+
+        invoice = values[:, 0::n_measures]
+        credit = values[:, 1::n_measures]
+        values[:, 2::n_measures] = np.where(pd.isna(invoice), 0, invoice) - np.where(pd.isna(credit), 0, credit)
+
+        return values
+
+    @staticmethod
+    def _info_columns(
+        all_customers: np.ndarray,
+        customer_codes: np.ndarray,
+        name_values: Optional[np.ndarray],
+        customers: Optional[dict[str, str]],
+        compact: bool,
+    ) -> tuple[Any, Any]:
+        """
+        Builds the ('Info', 'Customer') and ('Info', 'Name') columns of the report, one entry per customer.
+        """
+        if customers is None:
+            # Every row of a customer carries the same name, any of them will do
+            names = np.full(len(all_customers), np.nan, dtype=object)
+            names[customer_codes] = name_values
+            names[pd.isna(names)] = np.nan
+        else:
+            names = [customers.get(code, np.nan) for code in all_customers]
+
+        if compact:
+            customer_column = pd.Categorical.from_codes(np.arange(len(all_customers)), categories=all_customers)
+            return customer_column, pd.Categorical(names)
+
+        return all_customers, np.array(names, dtype=object)
+
+    @staticmethod
+    @traced('revenue.build_report', params=('granularity',))
+    def build_final_report(  # noqa: PLR0913, PLR0914, PLR0917
+        invoices: pd.DataFrame,
+        credits: pd.DataFrame,
+        customers: Optional[dict[str, str]],
+        start_year: int,
+        end_year: int,
+        compact: bool = True,
+        granularity: ReportGranularity = ReportGranularity.YEAR,
+        through_month: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Builds the annual revenue report in a single vectorized pass.
+        Produces the same frame as split_revenue_by_year, merge_and_equalize_by_year and
+        create_final_report combined: one row per customer (sorted by code) and, for each
+        year, the invoice amount, the credit amount and the balance between them.
+
+        In compact mode the customer codes and names are categorical (the codes share the
+        customer dictionary) and the amounts are float32 when every value round-trips to the
+        cent, otherwise float64. The amounts are written once into a single block, without
+        intermediate per-year frames.
+
+        Monthly data is rolled up to the requested granularity in the same scatter, summing
+        the months of each period, so any view is derived from the cached monthly data.
+        Args:
+            invoices (pd.DataFrame): DataFrame containing invoice data (Year, [Month,] Customer, Amount).
+            credits (pd.DataFrame): DataFrame containing credit data (Year, [Month,] Customer, Amount).
+            customers (dict[str, str], optional): Dictionary of customer codes and names. None takes
+                the names from the 'Name' column of the revenue data.
+            start_year (int): Start year for the data.
+            end_year (int): End year for the data.
+            compact (bool): Whether to use the memory-compact representation.
+            granularity (ReportGranularity): Period of the columns. Anything other than YEAR
+                requires the Month column.
+            through_month (int, optional): Last month of each year in the YTD view, defaults
+                to the current month.
+        Returns:
+            pd.DataFrame: Report with ('Info', 'Customer'), ('Info', 'Name') and
+                (period, 'Amount_invoice' | 'Amount_credit' | 'Balance') columns, where
+                period is the year for the annual view and a label such as '2024-T1',
+                '2024-03' or '2024 YTD' otherwise.
+        """
+        sources = [(measure, df) for measure, df in enumerate((invoices, credits)) if not df.empty]
+
+        if not sources:
+            return pd.DataFrame()
+
+        customer_values = np.concatenate([df['Customer'].to_numpy() for _, df in sources])
+        year_values = np.concatenate([df['Year'].to_numpy(dtype=np.int64) for _, df in sources])
+        amount_values = np.concatenate([df['Amount'].to_numpy() for _, df in sources])
+        name_values = (
+            np.concatenate([df['Name'].to_numpy(dtype=object) for _, df in sources]) if customers is None else None
+        )
+        measure_values = np.concatenate([np.full(len(df), measure, dtype=np.intp) for measure, df in sources])
+        month_values = (
+            np.concatenate([df['Month'].to_numpy(dtype=np.int64) for _, df in sources])
+            if all('Month' in df.columns for _, df in sources)
+            else None
+        )
+
+        period_values, period_labels = AnnualRevenueService._period_index(
+            year_values, month_values, start_year, end_year, granularity, through_month
+        )
+
+        in_range = period_values >= 0
+        if not in_range.all():
+            customer_values = customer_values[in_range]
+            period_values = period_values[in_range]
+            amount_values = amount_values[in_range]
+            measure_values = measure_values[in_range]
+            if name_values is not None:
+                name_values = name_values[in_range]
+
+        if compact:
+            # Decimal amounts from the database become plain floats
+            amount_values = amount_values.astype(np.float64, copy=False)
+
+        # Customer codes sorted as in the per-year pipeline, positions index the rows
+        customer_codes, all_customers = pd.factorize(customer_values, sort=True)
+
+        values = AnnualRevenueService._scatter_amounts(
+            customer_codes, period_values, measure_values, amount_values, (len(all_customers), len(period_labels))
+        )
+
+        if compact:
+            values = AnnualRevenueService._downcast_amounts(values)
+
+        columns = pd.MultiIndex.from_tuples([
+            (period, measure) for period in period_labels for measure in REPORT_MEASURES
+        ])
+        report = pd.DataFrame(values, columns=columns, copy=False)
+
+        customer_column, name_column = AnnualRevenueService._info_columns(
+            all_customers, customer_codes, name_values, customers, compact
+        )
+
+        # Inserting the info columns adds new blocks without copying the amounts
+        report.insert(0, ('Info', 'Name'), name_column)
+        report.insert(0, ('Info', 'Customer'), customer_column)
+
+        return report
+
+    @staticmethod
+    @traced('revenue.compare_periods')
+    def compare_periods(report: pd.DataFrame, previous: object, current: object) -> ComparisonTableData:
+        """
+        Compares two periods of a report, per customer and in total, in vectorized NumPy.
+        Customers without invoices nor credits in a period do not count for its averages.
+        Growth rates are relative to the absolute value of the previous period, and NaN when
+        the previous period is zero.
+        Args:
+            report (pd.DataFrame): Report built by build_final_report.
+            previous (object): Label of the previous period, e.g. 2024 or '2024 YTD'.
+            current (object): Label of the current period.
+        Returns:
+            ComparisonTableData: Per-customer balance variation (as comparison_rows, aligned
+                with the report rows) and the totals, averages and their variations per measure.
+        """
+        measures = list(REPORT_MEASURES)
+
+        def measure_rows(period: object) -> np.ndarray:
+            # One row per measure, in float64 whatever the storage dtype of the report
+            positions = report.columns.get_indexer([(period, measure) for measure in measures])
+            return np.ascontiguousarray(report.iloc[:, positions].to_numpy(np.float64).T)
+
+        prev = measure_rows(previous)
+        curr = measure_rows(current)
+
+        invoice, credit, balance = (measures.index(name) for name in ('Amount_invoice', 'Amount_credit', 'Balance'))
+
+        # The balance is never NaN, activity is read from the invoice and credit columns
+        active_prev = int((~(np.isnan(prev[invoice]) & np.isnan(prev[credit]))).sum())
+        active_curr = int((~(np.isnan(curr[invoice]) & np.isnan(curr[credit]))).sum())
+
+        prev = np.nan_to_num(prev, copy=False)
+        curr = np.nan_to_num(curr, copy=False)
+
+        total_prev = prev.sum(axis=1)
+        total_curr = curr.sum(axis=1)
+        avg_prev = total_prev / max(active_prev, 1)
+        avg_curr = total_curr / max(active_curr, 1)
+
+        variation = curr[balance] - prev[balance]
+
+        group = f'{current} vs {previous}'
+        comparison_rows = pd.DataFrame(
+            {
+                (group, 'Variation'): variation,
+                (group, 'Variation_perc'): AnnualRevenueService._growth_rate(variation, prev[balance]),
+            },
+            index=report.index,
+        )
+
+        return ComparisonTableData(
+            comparison_rows=comparison_rows,
+            total_prev=pd.Series(total_prev, index=measures),
+            total_curr=pd.Series(total_curr, index=measures),
+            avg_prev=pd.Series(avg_prev, index=measures),
+            avg_curr=pd.Series(avg_curr, index=measures),
+            var_total_sales_copies=pd.Series(total_curr - total_prev, index=measures),
+            var_total_sales_perc=pd.Series(
+                AnnualRevenueService._growth_rate(total_curr - total_prev, total_prev), index=measures
+            ),
+            var_avg_sales_copies=pd.Series(avg_curr - avg_prev, index=measures),
+            var_avg_sales_perc=pd.Series(
+                AnnualRevenueService._growth_rate(avg_curr - avg_prev, avg_prev), index=measures
+            ),
+            previous_year=previous,
+            current_year=current,
+        )
+
+    @staticmethod
+    @traced('revenue.rank_customers')
+    def rank_customers(
+        report: pd.DataFrame, period: object, top_n: int, measure: str = 'Balance'
+    ) -> CustomerRankingData:
+        """
+        Ranks the customers of a period and classifies them by Pareto (ABC) analysis.
+        Only the top slice is sorted: it is selected with argpartition, and the remaining
+        customers are aggregated into a single 'Outros' row. The class counts come from
+        sorting the values alone, never the report rows.
+        Shares are relative to the positive revenue of the period, customers with a zero or
+        negative value are left in class C.
+        Args:
+            report (pd.DataFrame): Report built by build_final_report.
+            period (object): Label of the period to rank, e.g. 2024 or '2024 YTD'.
+            top_n (int): Number of customers in the top slice.
+            measure (str): Measure to rank by.
+        Returns:
+            CustomerRankingData: The top rows plus the 'Outros' row, the number of customers
+                per class, the positive total and the number of customers of the period.
+        """
+        values = np.nan_to_num(report[(period, measure)].to_numpy(np.float64))
+        total = float(values[values > 0].sum())
+
+        top_n = max(0, min(top_n, len(values)))
+        top = np.argpartition(-values, top_n - 1)[:top_n] if top_n else np.empty(0, dtype=np.intp)
+        top = top[np.argsort(-values[top], kind='stable')]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = values[top] / total * 100 if total else np.full(len(top), np.nan)
+
+        # A customer belongs to the class where its cumulative share starts
+        cumulative = np.cumsum(np.where(values[top] > 0, share, 0))
+        starts = cumulative - np.where(values[top] > 0, share, 0)
+        limits = np.array([limit for _, limit in PARETO_CLASS_LIMITS])
+        labels = np.array([label for label, _ in PARETO_CLASS_LIMITS])
+        classes = labels[np.minimum(np.searchsorted(limits, starts, side='right'), len(labels) - 1)]
+        classes[values[top] <= 0] = labels[-1]
+
+        top_rows = pd.DataFrame({
+            'Rank': pd.array(np.arange(1, len(top) + 1), dtype='Int64'),
+            'Customer': report[('Info', 'Customer')].to_numpy()[top],
+            'Name': report[('Info', 'Name')].to_numpy()[top],
+            'Value': values[top],
+            'Share': share,
+            'Cumulative_share': cumulative,
+            'Class': classes,
+        })
+
+        top_rows = AnnualRevenueService._append_others_row(top_rows, values, top, total)
+        class_counts = AnnualRevenueService._class_counts(values, total)
+
+        return CustomerRankingData(
+            top_rows=top_rows, class_counts=class_counts, total=total, customers=len(values), period=period
+        )
+
+    @staticmethod
+    def _append_others_row(top_rows: pd.DataFrame, values: np.ndarray, top: np.ndarray, total: float) -> pd.DataFrame:
+        """
+        Appends the row that aggregates the customers outside the top slice, if any.
+        """
+        others = len(values) - len(top)
+        if not others:
+            return top_rows
+
+        others_value = float(values.sum() - values[top].sum())
+        # Same dtypes as the top rows, so the concatenation keeps them (Rank stays an integer)
+        others_row = pd.DataFrame({
+            'Rank': pd.array([pd.NA], dtype='Int64'),
+            'Customer': pd.Series([None], dtype=object),
+            'Name': pd.Series([f'Outros ({others} clientes)'], dtype=object),
+            'Value': np.array([others_value]),
+            'Share': np.array([others_value / total * 100 if total else np.nan]),
+            'Cumulative_share': np.array([np.nan]),
+            'Class': pd.Series([None], dtype=object),
+        })
+
+        return pd.concat([top_rows, others_row], ignore_index=True)
+
+    @staticmethod
+    def _class_counts(values: np.ndarray, total: float) -> dict[str, int]:
+        """
+        Counts the customers of each Pareto class over every customer, from the sorted positive values only.
+        """
+        positive = values[values > 0]
+        limits = np.array([limit for _, limit in PARETO_CLASS_LIMITS])
+        labels = [label for label, _ in PARETO_CLASS_LIMITS]
+
+        cumulative = np.cumsum(np.sort(positive)[::-1]) / total * 100 if total else np.empty(0)
+        starts = np.concatenate(([0.0], cumulative[:-1])) if len(cumulative) else cumulative
+
+        # Customers starting below a limit belong to its class or to a previous one
+        reached = np.searchsorted(starts, limits, side='left')
+        reached[-1] = len(positive)
+        class_counts = dict(zip(labels, np.diff(reached, prepend=0).tolist()))
+        class_counts[labels[-1]] += len(values) - len(positive)
+
+        return class_counts
+
+    @staticmethod
+    def _growth_rate(variation: np.ndarray, base: np.ndarray) -> np.ndarray:
+        """
+        Returns the variation as a percentage of the absolute base, NaN where the base is zero.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(base != 0, variation / np.abs(base) * 100, np.nan)
+
+    @staticmethod
+    def _period_index(  # noqa: PLR0913, PLR0917
+        year_values: np.ndarray,
+        month_values: Optional[np.ndarray],
+        start_year: int,
+        end_year: int,
+        granularity: ReportGranularity,
+        through_month: Optional[int],
+    ) -> tuple[np.ndarray, list]:
+        """
+        Maps each row to the index of its period column.
+        Args:
+            year_values (np.ndarray): Year of each row.
+            month_values (np.ndarray, optional): Month of each row, required below the year grain.
+            start_year (int): Start year for the data.
+            end_year (int): End year for the data.
+            granularity (ReportGranularity): Period of the columns.
+            through_month (int, optional): Last month of each year in the YTD view.
+        Returns:
+            tuple: The period index of each row (-1 for rows outside the report) and the
+                labels of the periods.
+        """
+        granularity = ReportGranularity(granularity)
+        years = range(start_year, end_year + 1)
+        year_offsets = year_values - start_year
+        in_range = (year_values >= start_year) & (year_values <= end_year)
+
+        if granularity is not ReportGranularity.YEAR and month_values is None:
+            raise ValueError(f'Dados sem mês, não é possível agregar por {granularity}.')
+
+        if granularity is ReportGranularity.YEAR:
+            periods, labels = year_offsets, list(years)
+        elif granularity is ReportGranularity.YTD:
+            through_month = through_month or datetime.date.today().month
+            in_range &= month_values <= through_month
+            periods, labels = year_offsets, [f'{year} YTD' for year in years]
+        elif granularity is ReportGranularity.QUARTER:
+            periods = year_offsets * 4 + (month_values - 1) // 3
+            labels = [f'{year}-T{quarter}' for year in years for quarter in range(1, 5)]
+        else:
+            periods = year_offsets * 12 + month_values - 1
+            labels = [f'{year}-{month:02d}' for year in years for month in range(1, 13)]
+
+        return np.where(in_range, periods, -1), labels
+
+    @staticmethod
+    def _downcast_amounts(values: np.ndarray) -> np.ndarray:
+        """
+        Converts the amounts to float32 if every value is kept within half a cent.
+        Args:
+            values (np.ndarray): Amounts as float64.
+        Returns:
+            np.ndarray: The float32 amounts, or the original ones if precision would be lost.
+        """
+        compact = values.astype(np.float32)
+        error = np.abs(compact - values)
+
+        if np.nanmax(error, initial=0.0) < AMOUNT_TOLERANCE:
+            return compact
+
+        logger.debug('Valores fora da precisão de float32, mantidos em float64.')
+        return values
@@ -1,19 +1,64 @@
+import contextvars
 import logging
+from typing import Any, Optional
 
-from pwdlib import PasswordHash
-
+from config.settings import get_settings
 from repository.user_repository import UserRepository
+from services.password_hashing import PasswordHashingBusyError, PasswordHashingService
+from utils.result_cache import result_cache
+from utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# Password hash read by the metadata lookup of the current login on a cache miss, see login
+_loaded_password_hash: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    'loaded_password_hash', default=None
+)
+
+
+class UserNotFoundError(LookupError):
+    """
+    Raised by the metadata lookup when the user does not exist or cannot be read, so it is not cached.
+    """
+
 
 class AuthenticationService:
     """
     Authentication service for handling user login and registration.
     """
 
-    # Password hashing context
-    pwd_context = PasswordHash.recommended()
+    @staticmethod
+    @result_cache.cached(namespace='user_metadata', ttl=get_settings().auth.user_metadata_ttl)
+    def _load_user_metadata(username: str) -> dict[str, Any]:
+        credentials = UserRepository().get_credentials(username=username)
+
+        if credentials is None:
+            raise UserNotFoundError(username)
+
+        # The password hash is not cached, it is handed to the login that ran this lookup
+        _loaded_password_hash.set(credentials.password_hash)
+
+        return {
+            'id': credentials.id,
+            'username': credentials.username,
+            'name': credentials.name,
+            'enabled': credentials.enabled,
+        }
+
+    @staticmethod
+    @traced('auth.user_metadata')
+    def get_user_metadata(username: str) -> Optional[dict[str, Any]]:
+        """
+        Returns the non-secret metadata of a user (id, username, name, enabled), cached for
+        AuthSettings.user_metadata_ttl seconds and cleared when a password changes.
+        The enabled flag (ENAFLG_0) is informative, the login does not check it.
+        :param username: Username of the user
+        :return: The metadata of the user, None if not found. Callers must not mutate it.
+        """
+        try:
+            return AuthenticationService._load_user_metadata(username=(username or '').strip().upper())
+        except UserNotFoundError:
+            return None
 
     @staticmethod
     def login(username: str, password: str) -> dict[str, str]:
@@ -22,43 +67,88 @@ class AuthenticationService:
         :param username: Username of the user
         :param password: Password of the user
         :return: A dictionary containing user information if authentication is successful
+        :raises ValueError: If the password hashing pool is saturated
         """
+        token = _loaded_password_hash.set(None)
+        try:
+            user = AuthenticationService.get_user_metadata(username)
+            # Set only when the metadata was not cached, by the query that loaded it
+            db_password = _loaded_password_hash.get()
+        finally:
+            _loaded_password_hash.reset(token)
+
+        if not user:
+            logger.warning(f'User {username} not found during login attempt.')
+            return {}
+
+        logger.info(f'User {user["username"]} found in database.')
 
-        result = {}
         user_repository = UserRepository()
 
-        user = user_repository.get_by_username(username=username)
+        if db_password is None:
+            # Cached metadata, only the hash is read, by the primary key
+            db_password = user_repository.get_password_hash(user_id=user['id'])
 
-        if not user:
-            logger.warning(f'User {username} not found during login attempt.')
-        else:
-            logger.info(f'User {user.username} found in database.')
-
-            db_password = str(user.password).strip()
-            password_ok = False
-
-            if len(db_password) == 0:
-                logger.warning(f'User {username} has no password set.')
-
-                hash = AuthenticationService.pwd_context.hash(password)
-
-                try:
-                    if user is not None:
-                        if user_repository.set_user_password(user, new_password_hash=hash):
-                            logger.info(f'Password set for user {username}.')
-                            return_user = user.to_dict(include=['id', 'name', 'username'], exclude={'password'})
-                            result = return_user
-                        else:
-                            logger.error(f'Failed to set password for user {username}.')
-                    else:
-                        logger.error(f'User {username} has no id set.')
-                except Exception as e:
-                    logger.error(f'Error updating user {username}: {e}')
+        if db_password is None:
+            logger.error(f'Password hash of user {username} could not be read.')
+            return {}
+
+        try:
+            return AuthenticationService._check_password(user_repository, user, db_password, password)
+        except PasswordHashingBusyError as e:
+            logger.error(f'Password hashing pool saturated during login of {username}: {e}')
+            raise ValueError('the server is busy, please try again in a moment.') from e
+
+    @staticmethod
+    def _set_password(user_repository: UserRepository, user: dict[str, Any], password_hash: str) -> bool:
+        """
+        Stores a new password hash of a user and clears the cached user metadata.
+        """
+        if not user_repository.set_user_password(user_id=user['id'], new_password_hash=password_hash):
+            return False
+
+        AuthenticationService._load_user_metadata.clear()
+
+        return True
+
+    @staticmethod
+    def _check_password(
+        user_repository: UserRepository, user: dict[str, Any], db_password: str, password: str
+    ) -> dict[str, str]:
+        """
+        Checks the password of a user, setting it on first login and rehashing it when its
+        hash was made with outdated Argon2 parameters.
+        """
+        username = user['username']
+        result = {'id': user['id'], 'name': user['name'], 'username': username}
+
+        if len(db_password) == 0:
+            logger.warning(f'User {username} has no password set.')
+
+            hash = PasswordHashingService.hash(password)
+
+            try:
+                if AuthenticationService._set_password(user_repository, user, hash):
+                    logger.info(f'Password set for user {username}.')
+                    return result
+
+                logger.error(f'Failed to set password for user {username}.')
+            except Exception as e:
+                logger.error(f'Error updating user {username}: {e}')
+
+            return {}
+
+        password_ok, updated_hash = PasswordHashingService.verify_and_update(password, db_password)
+
+        if not password_ok:
+            return {}
+
+        # The hash was made with other Argon2 parameters, it is replaced transparently
+        if updated_hash is not None:
+            if AuthenticationService._set_password(user_repository, user, updated_hash):
+                logger.info(f'Password of user {username} rehashed with the current parameters.')
             else:
-                password_ok = AuthenticationService.pwd_context.verify(password, db_password)
-                if password_ok:
-                    return_user = user.to_dict(include=['id', 'name', 'username'], exclude={'password'})
-                    result = return_user
+                logger.warning(f'Failed to rehash the password of user {username}.')
 
         return result
 
@@ -1,8 +1,8 @@
 import logging
 
-import streamlit as st
-
 from repository.country_repository import CountryRepository
+from utils.result_cache import result_cache
+from utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -16,13 +16,14 @@ class CountryService:
         pass
 
     @staticmethod
-    @st.cache_data(ttl=600)
-    def fetch_countries(country: list[str] | None = None) -> list[str]:
+    @traced('countries.fetch')
+    @result_cache.cached(namespace='countries', ttl=600)
+    def fetch_countries(country: list[str] | None = None) -> dict[str, str]:
         """
         Fetches a list of countries from the database.
 
         :param country: Optional list of country codes to filter by.
-        :return: List of country names.
+        :return: dictionary of country codes and names.
         """
         repository = CountryRepository()
 
@@ -1,8 +1,12 @@
 import logging
 
-import streamlit as st
+import pandas as pd
 
 from repository.customer_repository import CustomerRepository
+from utils.disk_cache import disk_cache
+from utils.result_cache import result_cache
+from utils.single_flight import single_flight
+from utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +20,8 @@ class CustomerService:
         pass
 
     @staticmethod
-    @st.cache_data(ttl=600)
+    @traced('customers.fetch')
+    @result_cache.cached(namespace='customers', ttl=600)
     def fetch_raw_customers(filter: list[str] | None = None) -> dict[str, str]:
         """
         Fetches a list of customers from the database.
@@ -24,14 +29,28 @@ class CustomerService:
         :param filter: Optional list of customer codes to filter by.
         :return: dictionary of customer codes and names.
         """
-        repository = CustomerRepository()
-
-        customers = repository.fetch_raw_customers(filter=filter)
+        customers = CustomerService._fetch_customers_frame(filter=filter)
 
-        if not customers:
+        if customers.empty:
             logger.warning('Nenhum cliente encontrado.')
             return {}
 
-        return_dict = {customer['code']: customer['name'] for customer in customers}
+        return_dict = dict(zip(customers['code'], customers['name']))
 
         return return_dict
+
+    @staticmethod
+    @single_flight.coalesce(namespace='customers')
+    @disk_cache.cached(namespace='customers', ttl=600, cache_empty=False)
+    def _fetch_customers_frame(filter: list[str] | None = None) -> pd.DataFrame:
+        """
+        Fetches the customers as a DataFrame with 'code' and 'name' columns, cached on disk.
+
+        :param filter: Optional list of customer codes to filter by.
+        :return: DataFrame of customer codes and names.
+        """
+        repository = CustomerRepository()
+
+        customers = repository.fetch_raw_customers(filter=filter)
+
+        return pd.DataFrame(customers, columns=['code', 'name'])
@@ -0,0 +1,193 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional, TypeVar
+
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from config.settings import get_settings
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+_pool: Optional[ThreadPoolExecutor] = None
+_password_hash: Optional[PasswordHash] = None
+_pool_lock = threading.Lock()
+
+
+class PasswordHashingBusyError(TimeoutError):
+    """
+    Raised when the hashing pool does not run an operation within AuthSettings.hash_timeout.
+    """
+
+
+class HashingMetrics:
+    """
+    Counters of the hashing pool: operations, timeouts, operations waiting for a worker,
+    and the time spent in the queue and in Argon2.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.operations = 0
+        self.timeouts = 0
+        self.pending = 0
+        self.max_pending = 0
+        self.queue_ms_total = 0.0
+        self.queue_ms_max = 0.0
+        self.run_ms_total = 0.0
+
+    def submitted(self) -> None:
+        with self._lock:
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+
+    def started(self, queue_ms: float) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.queue_ms_total += queue_ms
+            self.queue_ms_max = max(self.queue_ms_max, queue_ms)
+
+    def finished(self, run_ms: float) -> None:
+        with self._lock:
+            self.operations += 1
+            self.run_ms_total += run_ms
+
+    def timed_out(self, cancelled: bool) -> None:
+        with self._lock:
+            self.timeouts += 1
+            # A cancelled operation never reaches started()
+            if cancelled:
+                self.pending -= 1
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            operations = max(self.operations, 1)
+            return {
+                'operations': self.operations,
+                'timeouts': self.timeouts,
+                'pending': self.pending,
+                'max_pending': self.max_pending,
+                'queue_ms_avg': round(self.queue_ms_total / operations, 3),
+                'queue_ms_max': round(self.queue_ms_max, 3),
+                'run_ms_avg': round(self.run_ms_total / operations, 3),
+            }
+
+
+_metrics = HashingMetrics()
+
+
+def _get_pool() -> tuple[ThreadPoolExecutor, PasswordHash]:
+    """
+    Creates the hashing pool and the hasher on first use, once per process.
+    """
+    global _pool, _password_hash  # noqa: PLW0603
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                settings = get_settings().auth
+                _password_hash = PasswordHash((
+                    Argon2Hasher(
+                        time_cost=settings.argon2_time_cost,
+                        memory_cost=settings.argon2_memory_cost,
+                        parallelism=settings.argon2_parallelism,
+                    ),
+                ))
+                # argon2 releases the GIL while hashing, the workers bound the CPU and memory in use
+                _pool = ThreadPoolExecutor(max_workers=settings.hash_workers, thread_name_prefix='password-hash')
+                logger.info(
+                    f'Pool de hashing iniciado com {settings.hash_workers} workers '
+                    f'(argon2 t={settings.argon2_time_cost}, m={settings.argon2_memory_cost} KiB, '
+                    f'p={settings.argon2_parallelism}).'
+                )
+
+    return _pool, _password_hash
+
+
+class PasswordHashingService:
+    """
+    Hashes and verifies passwords in a bounded worker pool, so a burst of logins queues
+    instead of running every Argon2 computation at once on the Streamlit threads.
+    """
+
+    @staticmethod
+    def _run(operation: str, func: Callable[[PasswordHash], T]) -> T:
+        pool, password_hash = _get_pool()
+        timeout = get_settings().auth.hash_timeout
+        submitted = time.perf_counter()
+        timings: dict[str, float] = {}
+
+        def task() -> T:
+            started = time.perf_counter()
+            timings['queue_ms'] = (started - submitted) * 1000
+            _metrics.started(timings['queue_ms'])
+            try:
+                return func(password_hash)
+            finally:
+                timings['run_ms'] = (time.perf_counter() - started) * 1000
+                _metrics.finished(timings['run_ms'])
+
+        with span(f'auth.{operation}') as current:
+            _metrics.submitted()
+            future: Future = pool.submit(task)
+
+            try:
+                result = future.result(timeout=timeout)
+            except FutureTimeoutError as e:
+                _metrics.timed_out(cancelled=future.cancel())
+                logger.warning(f'Operação de hashing {operation} excedeu {timeout} s. Métricas: {_metrics.snapshot()}')
+                raise PasswordHashingBusyError(f'Password {operation} did not run within {timeout} s') from e
+
+            logger.debug(
+                'Operação de hashing %s: %.1f ms em fila, %.1f ms de execução',
+                operation,
+                timings['queue_ms'],
+                timings['run_ms'],
+            )
+            if current is not None:
+                current.set(queue_ms=round(timings['queue_ms'], 3), run_ms=round(timings['run_ms'], 3))
+
+            return result
+
+    @staticmethod
+    def hash(password: str) -> str:
+        """
+        Hashes a password with the configured Argon2 parameters.
+        Args:
+            password (str): The password.
+        Returns:
+            str: The hash.
+        Raises:
+            PasswordHashingBusyError: If the pool does not hash it within AuthSettings.hash_timeout.
+        """
+        return PasswordHashingService._run('hash', lambda password_hash: password_hash.hash(password))
+
+    @staticmethod
+    def verify_and_update(password: str, hash: str) -> tuple[bool, Optional[str]]:
+        """
+        Verifies a password against its hash.
+        Args:
+            password (str): The password.
+            hash (str): The stored hash.
+        Returns:
+            tuple[bool, Optional[str]]: Whether the password matches, and a new hash with the configured
+                Argon2 parameters if the stored one was made with other parameters.
+        Raises:
+            PasswordHashingBusyError: If the pool does not verify it within AuthSettings.hash_timeout.
+        """
+        return PasswordHashingService._run(
+            'verify', lambda password_hash: password_hash.verify_and_update(password, hash)
+        )
+
+    @staticmethod
+    def metrics() -> dict[str, Any]:
+        """
+        Returns the counters and the queue and run times of the hashing pool.
+        """
+        return _metrics.snapshot()
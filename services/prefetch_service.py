@@ -0,0 +1,96 @@
+import datetime
+import logging
+import threading
+import time
+from typing import Optional
+
+from config.settings import get_settings
+from utils.local_menus import Chapter645
+from utils.tracing import trace_run
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchService:
+    """
+    Service class to warm the report caches in a background thread.
+    The default report datasets are computed once at startup and, optionally, periodically,
+    so the common first-click path is a cache hit.
+    """
+
+    _lock = threading.Lock()
+    _thread: Optional[threading.Thread] = None
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def prefetch_default_reports(years: Optional[int] = None) -> None:
+        """
+        Fills the caches with the default report datasets.
+        The revenue data is cached per year, so prefetching the widest range also
+        covers every narrower range ending in the current year.
+        Args:
+            years (int, optional): Number of years, ending in the current year, to prefetch.
+                Defaults to PrefetchSettings.years.
+        """
+        # Imported here, in the prefetch thread, so that starting it does not slow down the first render
+        from services.annual_revenue_service import AnnualRevenueService  # noqa: PLC0415
+
+        if years is None:
+            years = get_settings().prefetch.years
+
+        end_year = datetime.date.today().year
+        start_year = end_year - (years - 1)
+
+        started = time.perf_counter()
+        logger.info(f'Pré-carregar dados dos relatórios entre {start_year} e {end_year}')
+
+        loaders = []
+
+        for invoice_type in (Chapter645.INVOICE, Chapter645.CREDIT_NOTE):
+            loaders.append((
+                f'receita ({invoice_type.name})',
+                lambda invoice_type=invoice_type: AnnualRevenueService.fetch_revenue_data(
+                    start_year=start_year, end_year=end_year, invoice_type=invoice_type.value
+                ),
+            ))
+
+        for name, loader in loaders:
+            try:
+                loader()
+            except Exception as e:
+                logger.error(f'Erro ao pré-carregar {name}: {e}', exc_info=True)
+
+        logger.info(f'Dados dos relatórios pré-carregados em {time.perf_counter() - started:.2f}s')
+
+    @staticmethod
+    def _run(interval: float) -> None:
+        while True:
+            with trace_run('prefetch'):
+                PrefetchService.prefetch_default_reports()
+
+            if interval <= 0:
+                break
+
+            time.sleep(interval)
+
+    @classmethod
+    def start(cls, interval: Optional[float] = None) -> None:
+        """
+        Starts the prefetch thread, once per process.
+        Args:
+            interval (float, optional): Seconds between refreshes, 0 to prefetch only once.
+                Defaults to PrefetchSettings.interval.
+        """
+        if interval is None:
+            interval = get_settings().prefetch.interval
+
+        with cls._lock:
+            if cls._thread is not None:
+                return
+
+            cls._thread = threading.Thread(target=cls._run, args=(interval,), name='report-prefetch', daemon=True)
+            cls._thread.start()
+
+        logger.info(f'Pré-carregamento dos relatórios iniciado (intervalo: {interval}s)')
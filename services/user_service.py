@@ -2,7 +2,6 @@ import logging
 from typing import Optional
 
 import pyodbc
-import streamlit as st
 from pydantic import ValidationError
 
 from database.manager import db
@@ -29,7 +28,6 @@ class UserService:
         """
 
         if not db:
-            st.error('Gerenciador do banco não disponível.')
             logger.error('Database manager not available for user update.')
             return
 
@@ -41,7 +39,6 @@ class UserService:
 
         if not update_data:
             logger.info('Nenhum campo válido fornecido para atualização após processar o payload.')
-            st.warning('Nenhum dado válido fornecido para atualização.')
             return
 
         table_name = 'AUTILIS'
@@ -79,11 +76,9 @@ class UserService:
                 logger.info(f'Utilizador ROWID {user_id} atualizado com sucesso. Linhas afetadas: {cursor.rowcount}')
                 return
         except pyodbc.Error as e:
-            st.error(f'Erro de banco de dados (PyODBC) ao atualizar utilizador ROWID {user_id}: {e}')
             logger.error(f'Erro PyODBC ao atualizar utilizador ROWID {user_id}: {e}', exc_info=True)
             return
         except Exception as e:
-            st.error(f'Erro inesperado (PyODBC) ao atualizar utilizador ROWID {user_id}: {e}')
             logger.error(f'Erro inesperado PyODBC ao atualizar utilizador ROWID {user_id}: {e}', exc_info=True)
             return
 
@@ -96,7 +91,6 @@ class UserService:
         :return: True if successful, False otherwise.
         """
         if not db:
-            st.error('Gerenciador do banco não disponível.')
             logger.error('Database manager not available for user update.')
             return False
 
@@ -123,11 +117,9 @@ class UserService:
                 logger.info(f'User with ID {user_id} update successfully. Rows affected: {cursor.rowcount}')
                 return True
         except pyodbc.Error as e:
-            st.error(f'Erro de banco de dados (PyODBC) ao atualizar utilizador ROWID {user_id}: {e}')
             logger.error(f'Erro PyODBC ao atualizar utilizador ROWID {user_id}: {e}', exc_info=True)
             return False
         except Exception as e:
-            st.error(f'Erro inesperado (PyODBC) ao atualizar utilizador ROWID {user_id}: {e}')
             logger.error(f'Erro inesperado PyODBC ao atualizar utilizador ROWID {user_id}: {e}', exc_info=True)
             return False
 
@@ -165,7 +157,7 @@ class UserService:
         """
 
         if not db:
-            st.error('Gerenciador do banco não disponível.')
+            logger.error('Database manager not available for user lookup.')
             return None
 
         logger.info(f'(Service) Buscar utilizador por username: {username} ou email: {email}')
@@ -210,14 +202,11 @@ class UserService:
                     return user_model
                 except ValidationError as ve:
                     logger.error(f'Erro de validação Pydantic para dados do utilizador: {ve}', exc_info=True)
-                    st.error(f'Os dados do utilizador recuperados são inválidos: {ve}')
                     return None
         except pyodbc.Error as e:
-            st.error(f'Erro de banco de dados (PyODBC) ao buscar utilizador: {e}')
             logger.error(f'Erro PyODBC ao buscar utilizador: {e}', exc_info=True)
             return None
         except Exception as e:
-            st.error(f'Erro inesperado (PyODBC) ao buscar utilizador: {e}')
             logger.error(f'Erro inesperado PyODBC ao buscar utilizador: {e}', exc_info=True)
             return None
 
@@ -226,7 +215,7 @@ class UserService:
         """fetch user by id"""
 
         if not db:
-            st.error('Gerenciador do banco não disponível.')
+            logger.error('Database manager not available for user lookup.')
             return None
 
         logger.info(f'Buscar utilizador {user_id} por ID')
@@ -263,13 +252,10 @@ class UserService:
                     return user_model
                 except ValidationError as ve:
                     logger.error(f'Erro de validação Pydantic para dados do utilizador: {ve}', exc_info=True)
-                    st.error(f'Os dados do utilizador recuperados são inválidos: {ve}')
                     return None
         except pyodbc.Error as e:
-            st.error(f'Erro de banco de dados (PyODBC) ao buscar utilizador: {e}')
             logger.error(f'Erro PyODBC ao buscar utilizador: {e}', exc_info=True)
             return None
         except Exception as e:
-            st.error(f'Erro inesperado (PyODBC) ao buscar utilizador: {e}')
             logger.error(f'Erro inesperado PyODBC ao buscar utilizador: {e}', exc_info=True)
             return None
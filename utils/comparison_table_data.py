@@ -1,11 +1,10 @@
 from typing import Any, NamedTuple
 
 import pandas as pd
-import streamlit as st
 
 
 class ComparisonTableData(NamedTuple):
-    comparison_rows: list[Any]
+    comparison_rows: pd.DataFrame
     total_prev: pd.Series
     total_curr: pd.Series
     avg_prev: pd.Series
@@ -18,24 +17,85 @@ class ComparisonTableData(NamedTuple):
     current_year: int
 
 
+class CustomerRankingData(NamedTuple):
+    top_rows: pd.DataFrame
+    class_counts: dict[str, int]
+    total: float
+    customers: int
+    period: Any
+
+
 def config_columns_to_annual_revenue() -> dict[str, Any]:
     """
     Configures the columns for the annual revenue table.
     Returns:
         dict[str, Any]: A dictionary containing the columns configuration.
     """
+    # Only the pages use the column configurations, the services load this module without Streamlit
+    import streamlit as st  # noqa: PLC0415
 
     columns_config = {
         'Customer': st.column_config.TextColumn(label='Cliente', width='small'),
         'Name': st.column_config.TextColumn(label='Nome', width='medium'),
-        'Amount_invoice': st.column_config.NumberColumn(label='Total', width='small'),
-        'Amount_credit': st.column_config.NumberColumn(label='Total', width='small'),
-        'Balance': st.column_config.NumberColumn(label='Saldo', width='small'),
+        'Amount_invoice': st.column_config.NumberColumn(label='Total', width='small', format='%.2f'),
+        'Amount_credit': st.column_config.NumberColumn(label='Total', width='small', format='%.2f'),
+        'Balance': st.column_config.NumberColumn(label='Saldo', width='small', format='%.2f'),
+        'Variation': st.column_config.NumberColumn(label='Variação', width='small', format='%.2f'),
+        'Variation_perc': st.column_config.NumberColumn(label='Variação %', width='small', format='%.1f%%'),
     }
 
     return columns_config
 
 
+def config_columns_to_customer_ranking() -> dict[str, Any]:
+    """
+    Configures the columns for the top customers table.
+    Returns:
+        dict[str, Any]: A dictionary containing the columns configuration.
+    """
+    # Only the pages use the column configurations, the services load this module without Streamlit
+    import streamlit as st  # noqa: PLC0415
+
+    columns_config = {
+        'Rank': st.column_config.NumberColumn(label='Posição', width='small'),
+        'Customer': st.column_config.TextColumn(label='Cliente', width='small'),
+        'Name': st.column_config.TextColumn(label='Nome', width='medium'),
+        'Value': st.column_config.NumberColumn(label='Saldo', width='small', format='%.2f'),
+        'Share': st.column_config.NumberColumn(label='% do total', width='small', format='%.2f%%'),
+        'Cumulative_share': st.column_config.NumberColumn(label='% acumulada', width='small', format='%.2f%%'),
+        'Class': st.column_config.TextColumn(label='Classe', width='small'),
+    }
+
+    return columns_config
+
+
+def annual_revenue_column_label(column: Any) -> str:
+    """
+    Returns a readable label for a column of the annual revenue report.
+    Args:
+        column (Any): Column key, a (group, measure) tuple or None.
+    Returns:
+        str: The label of the column.
+    """
+    labels = {
+        'Customer': 'Cliente',
+        'Name': 'Nome',
+        'Amount_invoice': 'Faturas',
+        'Amount_credit': 'Notas de crédito',
+        'Balance': 'Saldo',
+        'Variation': 'Variação',
+        'Variation_perc': 'Variação %',
+    }
+
+    if column is None:
+        return 'Cliente (padrão)'
+
+    group, measure = column
+    label = labels.get(measure, str(measure))
+
+    return label if group == 'Info' else f'{group} - {label}'
+
+
 def format_value(val):
     if pd.isna(val):
         return ''
@@ -0,0 +1,108 @@
+import bisect
+import re
+import unicodedata
+from typing import Any, Iterable
+
+import numpy as np
+
+# Highest code point, appended to a prefix to find the end of its range in the sorted tokens
+_PREFIX_END = '\U0010ffff'
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def normalize_text(text: Any) -> str:
+    """
+    Normalizes a text for searching: accents removed and case folded.
+    """
+    if not isinstance(text, str):
+        return ''
+
+    if text.isascii():
+        return text.casefold()
+
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def tokenize(text: Any) -> list[str]:
+    """
+    Splits a text into normalized tokens.
+    """
+    return _TOKEN_PATTERN.findall(normalize_text(text))
+
+
+class CustomerSearchIndex:
+    """
+    Prefix index over the customer codes and names of a report.
+    The distinct tokens of the codes and names are kept sorted, each one pointing to a slice
+    of a postings array with the positions of its rows. Tokens sharing a prefix are adjacent,
+    so each search term is resolved with two binary searches and one contiguous slice instead
+    of scanning every row. A row matches when every term of the query is the prefix of one of
+    its tokens, e.g. 'silva jo' matches 'João da Silva'.
+    """
+
+    def __init__(self, codes: Iterable[Any], names: Iterable[Any]):
+        postings: dict[str, list[int]] = {}
+        size = 0
+
+        for position, (code, name) in enumerate(zip(codes, names)):
+            row_tokens = set(tokenize(code))
+            row_tokens.update(tokenize(name))
+
+            # The whole code is a token too, so codes with separators match as typed
+            code_text = normalize_text(code)
+            if code_text:
+                row_tokens.add(code_text)
+
+            for token in row_tokens:
+                postings.setdefault(token, []).append(position)
+
+            size = position + 1
+
+        self.size = size
+        self._tokens = sorted(postings)
+
+        # Postings of token i are rows[offsets[i]:offsets[i + 1]], sorted by position
+        lengths = [len(postings[token]) for token in self._tokens]
+        self._offsets = np.zeros(len(lengths) + 1, dtype=np.intp)
+        np.cumsum(lengths, out=self._offsets[1:])
+        self._rows = np.fromiter(
+            (position for token in self._tokens for position in postings[token]),
+            dtype=np.intp,
+            count=int(self._offsets[-1]),
+        )
+
+    def _match_prefix(self, prefix: str) -> np.ndarray:
+        first = bisect.bisect_left(self._tokens, prefix)
+        last = bisect.bisect_left(self._tokens, prefix + _PREFIX_END, lo=first)
+
+        rows = self._rows[self._offsets[first] : self._offsets[last]]
+
+        # A single token has its positions sorted and unique already
+        return rows if last - first <= 1 else np.unique(rows)
+
+    def search(self, text: str) -> np.ndarray:
+        """
+        Returns the positions of the rows matching every term of the text.
+        Args:
+            text (str): Search text, case and accent insensitive. Empty returns every row.
+        Returns:
+            np.ndarray: Sorted integer positions of the matching rows.
+        """
+        terms = set(tokenize(text))
+
+        if not terms:
+            return np.arange(self.size)
+
+        positions = None
+
+        # Longest terms first, they usually are the most selective
+        for term in sorted(terms, key=len, reverse=True):
+            matches = self._match_prefix(term)
+            positions = matches if positions is None else np.intersect1d(positions, matches, assume_unique=True)
+
+            if len(positions) == 0:
+                break
+
+        return positions
@@ -0,0 +1,183 @@
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    Disk-backed cache for DataFrames, shared between processes and restarts.
+    Each entry is stored as an Arrow IPC (Feather v2) file with a JSON metadata sidecar
+    holding the parameters, creation time and TTL. Entries are read through memory-mapping,
+    so a warm entry is served without re-querying the database and with little extra RAM.
+    """
+
+    DATA_SUFFIX = '.arrow'
+    META_SUFFIX = '.json'
+
+    def __init__(self, cache_dir: Path | str, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+
+    @staticmethod
+    def make_key(params: dict[str, Any]) -> str:
+        """
+        Builds a stable key for the given parameters.
+        Args:
+            params (dict[str, Any]): Parameters that identify the entry.
+        Returns:
+            str: Hexadecimal digest of the parameters.
+        """
+        payload = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _paths(self, namespace: str, key: str) -> tuple[Path, Path]:
+        base = self.cache_dir / namespace
+        return base / f'{key}{self.DATA_SUFFIX}', base / f'{key}{self.META_SUFFIX}'
+
+    def get(self, namespace: str, params: dict[str, Any]) -> Optional[pd.DataFrame]:
+        """
+        Retrieves a DataFrame from the cache.
+        Args:
+            namespace (str): Namespace of the entry.
+            params (dict[str, Any]): Parameters that identify the entry.
+        Returns:
+            Optional[pd.DataFrame]: The cached DataFrame, or None if missing or expired.
+        """
+        if not self.enabled:
+            return None
+
+        data_path, meta_path = self._paths(namespace, self.make_key(params))
+
+        try:
+            with meta_path.open('r', encoding='utf-8') as file:
+                metadata = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        ttl = metadata.get('ttl')
+        if ttl is not None and time.time() - metadata.get('created_at', 0) > ttl:
+            logger.debug(f'Entrada expirada na cache em disco: {namespace}/{meta_path.stem}')
+            self._remove(data_path, meta_path)
+            return None
+
+        try:
+            with pa.memory_map(str(data_path), 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+            df = table.to_pandas()
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f'Erro ao ler a cache em disco {data_path}: {e}')
+            self._remove(data_path, meta_path)
+            return None
+
+        logger.debug(f'Cache em disco encontrada: {namespace}/{data_path.stem} ({len(df)} linhas)')
+
+        return df
+
+    def put(self, namespace: str, params: dict[str, Any], df: pd.DataFrame, ttl: Optional[float] = None) -> None:
+        """
+        Stores a DataFrame in the cache.
+        Args:
+            namespace (str): Namespace of the entry.
+            params (dict[str, Any]): Parameters that identify the entry.
+            df (pd.DataFrame): DataFrame to store.
+            ttl (float, optional): Time to live in seconds, None to keep until invalidated.
+        """
+        if not self.enabled:
+            return
+
+        data_path, meta_path = self._paths(namespace, self.make_key(params))
+        metadata = {'namespace': namespace, 'params': params, 'created_at': time.time(), 'ttl': ttl, 'rows': len(df)}
+
+        try:
+            data_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Write to temporary files first so readers never see a partial entry
+            tmp_suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+            tmp_data = data_path.with_suffix(tmp_suffix)
+            tmp_meta = meta_path.with_suffix(tmp_suffix + '.json')
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(str(tmp_data), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+            with tmp_meta.open('w', encoding='utf-8') as file:
+                json.dump(metadata, file, default=str)
+
+            os.replace(tmp_data, data_path)
+            os.replace(tmp_meta, meta_path)
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f'Erro ao gravar a cache em disco {data_path}: {e}')
+
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        """
+        Removes the entries of a namespace, or the whole cache if no namespace is given.
+        """
+        target = self.cache_dir / namespace if namespace else self.cache_dir
+
+        shutil.rmtree(target, ignore_errors=True)
+        logger.info(f'Cache em disco invalidada: {namespace or "todas"}')
+
+    @staticmethod
+    def _remove(*paths: Path) -> None:
+        for path in paths:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    def cached(
+        self, namespace: str, ttl: Optional[float] = None, version: int = 1, cache_empty: bool = True
+    ) -> Callable:
+        """
+        Decorator that caches the DataFrame returned by a function on disk.
+        The function arguments are part of the key, so it must be called with hashable,
+        JSON serializable arguments. Exceptions are not cached.
+        Args:
+            namespace (str): Namespace of the entries.
+            ttl (float, optional): Time to live in seconds, None to keep until invalidated.
+            version (int): Format version, bump it when the shape of the result changes.
+            cache_empty (bool): Whether empty results are stored, disable it when an empty
+                result may come from a transient failure.
+        """
+
+        def decorator(func: Callable[..., pd.DataFrame]) -> Callable[..., pd.DataFrame]:
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs) -> pd.DataFrame:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                params = {'version': version, **bound.arguments}
+
+                df = self.get(namespace, params)
+                if df is not None:
+                    return df
+
+                df = func(*args, **kwargs)
+
+                if isinstance(df, pd.DataFrame) and (cache_empty or not df.empty):
+                    self.put(namespace, params, df, ttl=ttl)
+
+                return df
+
+            return wrapper
+
+        return decorator
+
+
+disk_cache = DiskCache(cache_dir=get_settings().cache.disk_cache_dir, enabled=get_settings().cache.disk_cache_enabled)
@@ -0,0 +1,40 @@
+import functools
+from typing import Any, Callable
+
+import streamlit as st
+
+from auth.guard import is_admin
+from utils.profiling import profile_active, profile_run
+from utils.tracing import current_span, span, trace_run
+
+
+def traced_fragment(name: str) -> Callable:
+    """
+    Decorator that makes a function a Streamlit fragment whose runs are traced and profiled.
+    A fragment rerun by its own widgets runs the function alone, outside the trace_run and
+    profile_run of main.py, so it opens its own trace and profile. Called from the page run
+    (or from an enclosing fragment) it is a span of the current trace instead. As in main.py,
+    only an admin's session is profiled with cProfile.
+    Args:
+        name (str): Name of the fragment, e.g. 'report_table'.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> Any:
+            if current_span() is not None or profile_active():
+                with span(f'fragment.{name}'):
+                    return func(*args, **kwargs)
+
+            with (
+                trace_run(f'fragment.{name}', user=st.session_state.get('user')),
+                profile_run(
+                    f'fragment.{name}',
+                    deterministic=is_admin() and st.session_state.get('profiling_session', False),
+                ),
+            ):
+                return func(*args, **kwargs)
+
+        return st.fragment(wrapper)
+
+    return decorator
@@ -0,0 +1,307 @@
+import contextvars
+import cProfile
+import datetime
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import FrameType
+from typing import Iterator, Optional
+
+from config.settings import get_settings
+from utils.tracing import current_trace_id
+
+logger = logging.getLogger(__name__)
+
+PSTATS_SUFFIX = '.pstats'
+COLLAPSED_SUFFIX = '.collapsed'
+# Fields of a profile file name: timestamp, name, duration, mode and trace ID, see _write
+_PROFILE_NAME_FIELDS = 5
+
+_files_lock = threading.Lock()
+# A single cProfile session runs at a time in the process, see profile_run
+_cprofile_lock = threading.Lock()
+
+# Prefix of the worker threads started by the current profiled run, see run_thread_prefix
+_run_prefix: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('profile_run_prefix', default=None)
+
+
+def profile_active() -> bool:
+    """
+    Returns whether the current context runs inside profile_run.
+    """
+    return _run_prefix.get() is not None
+
+
+def run_thread_prefix(name: str) -> str:
+    """
+    Returns the name prefix of the worker threads of a pool started by the current run.
+    Inside profile_run the prefix is unique to the run, so its sampler samples these threads
+    and not the pools of the same name started by other sessions.
+    Args:
+        name (str): Name of the pool, e.g. 'report-annual_revenue_per_customer'.
+    Returns:
+        str: The thread name prefix.
+    """
+    prefix = _run_prefix.get()
+
+    return f'{prefix}{name}' if prefix else name
+
+
+def profiles_dir() -> str:
+    """
+    Returns the directory of the profiles, inside the logging directory.
+    """
+    settings = get_settings()
+
+    return os.path.join(settings.logging.dir, settings.profiling.dirname)
+
+
+class StackSampler:
+    """
+    Sampling profiler: a daemon thread reads the stack of the profiled threads every interval
+    and counts each distinct stack, in the collapsed format of flamegraph.pl and speedscope
+    ('outer;inner;innermost count'). Its overhead does not depend on the number of calls,
+    so it can run on every page run.
+    """
+
+    def __init__(self, thread_id: int, thread_prefixes: tuple[str, ...] = (), interval: float = 0.005):
+        """
+        Args:
+            thread_id (int): Thread ident of the profiled run.
+            thread_prefixes (tuple[str, ...]): Name prefixes of the worker threads of the run, also sampled.
+            interval (float): Seconds between samples.
+        """
+        self.thread_id = thread_id
+        self.thread_prefixes = thread_prefixes
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _collapse(frame: Optional[FrameType]) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f'{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+            frame = frame.f_back
+
+        return ';'.join(reversed(names))
+
+    def _targets(self) -> dict[int, str]:
+        targets = {self.thread_id: ''}
+
+        if self.thread_prefixes:
+            for thread in threading.enumerate():
+                prefix = next((p for p in self.thread_prefixes if thread.name.startswith(p)), None)
+                if thread.ident and prefix is not None:
+                    targets[thread.ident] = thread.name.removeprefix(prefix)
+
+        return targets
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            self.samples += 1
+
+            for ident, name in self._targets().items():
+                frame = frames.get(ident)
+                if frame is not None:
+                    stack = self._collapse(frame)
+                    # Worker stacks are rooted at their thread, outside the stack of the run
+                    self.stacks[f'{name.rstrip("_0123456789")};{stack}' if name else stack] += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._sample, name='profiler-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+@dataclass
+class ProfileResult:
+    """
+    Outcome of a profiled run. paths is empty if the profile was not kept.
+    """
+
+    name: str
+    duration_ms: float = 0.0
+    mode: str = 'sampling'
+    paths: tuple[str, ...] = ()
+
+
+def _slug(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9-]+', '-', name).strip('-') or 'run'
+
+
+def _prune(directory: str, max_files: int) -> None:
+    """
+    Removes the oldest profiles, keeping at most max_files runs.
+    """
+    entries = [os.path.splitext(entry) for entry in os.listdir(directory)]
+    runs = sorted({stem for stem, suffix in entries if suffix in {PSTATS_SUFFIX, COLLAPSED_SUFFIX}}, reverse=True)
+
+    for stem in runs[max_files:]:
+        for suffix in (PSTATS_SUFFIX, COLLAPSED_SUFFIX):
+            path = os.path.join(directory, stem + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _write(
+    result: ProfileResult, profiler: Optional[cProfile.Profile], sampler: Optional[StackSampler]
+) -> tuple[str, ...]:
+    directory = profiles_dir()
+    # The timestamp first, so the file names sort by date
+    stem = '_'.join((
+        datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f'),
+        _slug(result.name),
+        f'{result.duration_ms:.0f}ms',
+        result.mode,
+        current_trace_id() or 'notrace',
+    ))
+    paths = []
+
+    try:
+        with _files_lock:
+            os.makedirs(directory, exist_ok=True)
+
+            if profiler is not None:
+                path = os.path.join(directory, stem + PSTATS_SUFFIX)
+                profiler.dump_stats(path)
+                paths.append(path)
+
+            if sampler is not None and sampler.stacks:
+                path = os.path.join(directory, stem + COLLAPSED_SUFFIX)
+                with open(path, 'w', encoding='utf-8') as file:
+                    file.write(sampler.collapsed())
+                paths.append(path)
+
+            _prune(directory, get_settings().profiling.max_files)
+    except OSError as e:
+        logger.error(f'Erro ao escrever o perfil de {result.name}: {e}')
+
+    return tuple(paths)
+
+
+@contextmanager
+def profile_run(name: str, deterministic: bool = False) -> Iterator[Optional[ProfileResult]]:
+    """
+    Profiles a run and writes its profile to the profiles directory.
+    With deterministic=True (opted in per session by an admin) the run is profiled with cProfile,
+    written as .pstats, and always kept. Otherwise only the sampling profiler runs, and its
+    collapsed stacks are kept when the run is slower than ProfilingSettings.threshold_ms.
+    The sampler runs in both modes, so every kept profile has a flamegraph file. It samples the
+    calling thread and the worker threads named with run_thread_prefix.
+    Depending on the Python version, cProfile is a single profiler for the whole process that
+    hooks every thread: while an admin profiles a run, every session of the process runs under
+    the profiler hook and its calls appear in the .pstats. Only one cProfile session runs at
+    a time, a deterministic run that finds it taken falls back to the sampling profiler.
+    Args:
+        name (str): Name of the run, part of the file names.
+        deterministic (bool): Profile the run with cProfile and keep the profile.
+    Yields:
+        Optional[ProfileResult]: The result, filled when the run ends. None if profiling is disabled.
+    """
+    settings = get_settings().profiling
+
+    if not settings.enabled:
+        yield None
+        return
+
+    profiler = None
+    if deterministic:
+        if _cprofile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+        else:
+            logger.warning(f'cProfile já está ativo noutra execução, {name} é perfilado por amostragem.')
+
+    prefix = f'run-{uuid.uuid4().hex[:12]}-'
+    result = ProfileResult(name=name, mode='cprofile' if profiler is not None else 'sampling')
+    sampler = StackSampler(threading.get_ident(), (prefix,), interval=settings.interval_ms / 1000)
+    token = _run_prefix.set(prefix)
+    started = time.perf_counter()
+
+    try:
+        sampler.start()
+
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError as e:
+                # Another profiling tool of the process, e.g. a debugger
+                logger.warning(f'cProfile indisponível ({e}), {name} é perfilado por amostragem.')
+                profiler = None
+                result.mode = 'sampling'
+                _cprofile_lock.release()
+
+        yield result
+    finally:
+        result.duration_ms = (time.perf_counter() - started) * 1000
+        if profiler is not None:
+            profiler.disable()
+            _cprofile_lock.release()
+        sampler.stop()
+        _run_prefix.reset(token)
+
+        if deterministic or result.duration_ms >= settings.threshold_ms:
+            result.paths = _write(result, profiler, sampler)
+            logger.info(
+                f'Perfil de {name} ({result.mode}, {result.duration_ms:.0f} ms, '
+                f'{sampler.samples} amostras) guardado em: {", ".join(result.paths)}'
+            )
+
+
+def list_profiles() -> list[dict]:
+    """
+    Lists the profiles written by profile_run, most recent first.
+    Returns:
+        list[dict]: One entry per profiled run, with its date, name, duration, mode, trace ID and files.
+    """
+    directory = profiles_dir()
+
+    if not os.path.isdir(directory):
+        return []
+
+    profiles: dict[str, dict] = {}
+    for entry in os.listdir(directory):
+        stem, suffix = os.path.splitext(entry)
+        parts = stem.split('_')
+
+        if suffix not in {PSTATS_SUFFIX, COLLAPSED_SUFFIX} or len(parts) != _PROFILE_NAME_FIELDS:
+            continue
+
+        timestamp, name, duration, mode, trace_id = parts
+        try:
+            started = datetime.datetime.strptime(timestamp, '%Y%m%d-%H%M%S-%f')
+        except ValueError:
+            continue
+
+        profile = profiles.setdefault(
+            stem,
+            {
+                'started': started,
+                'name': name,
+                'duration_ms': float(duration.removesuffix('ms') or 0),
+                'mode': mode,
+                'trace_id': None if trace_id == 'notrace' else trace_id,
+                'files': {},
+            },
+        )
+        profile['files'][suffix] = os.path.join(directory, entry)
+
+    return sorted(profiles.values(), key=lambda profile: profile['started'], reverse=True)
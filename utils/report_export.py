@@ -0,0 +1,132 @@
+import csv
+import io
+from typing import BinaryIO, Iterator, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+EXPORT_CHUNK_SIZE = 10_000
+
+
+class ExportFormat(NamedTuple):
+    extension: str
+    mimetype: str
+
+
+EXPORT_FORMATS = {
+    'CSV': ExportFormat('csv', 'text/csv'),
+    'XLSX': ExportFormat('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'Parquet': ExportFormat('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def iter_chunks(
+    df: pd.DataFrame,
+    column_names: list[str],
+    positions: Optional[np.ndarray] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yields the rows of the DataFrame in chunks with flat column names.
+    Only one chunk is materialized at a time, the source frame is never copied as a whole.
+    Args:
+        df (pd.DataFrame): DataFrame to export.
+        column_names (list[str]): Flat names of the columns, in order.
+        positions (np.ndarray, optional): Positions of the rows to export, in order. Defaults to all rows.
+        chunk_size (int): Number of rows per chunk.
+    """
+    if positions is None:
+        positions = np.arange(len(df))
+
+    for start in range(0, len(positions), chunk_size):
+        chunk = df.iloc[positions[start : start + chunk_size]]
+        chunk.columns = column_names
+        yield chunk
+
+
+def export_csv(chunks: Iterator[pd.DataFrame], sink: BinaryIO) -> None:
+    """
+    Writes the chunks as CSV (UTF-8 with BOM, so Excel detects the encoding).
+    """
+    text = io.TextIOWrapper(sink, encoding='utf-8-sig', newline='', write_through=True)
+
+    try:
+        for index, chunk in enumerate(chunks):
+            chunk.to_csv(text, header=index == 0, index=False, float_format='%.2f', quoting=csv.QUOTE_MINIMAL)
+    finally:
+        # Leave the binary sink open for the caller
+        text.detach()
+
+
+def export_parquet(chunks: Iterator[pd.DataFrame], sink: BinaryIO) -> None:
+    """
+    Writes the chunks as Parquet, one row group per chunk.
+    """
+    writer: Optional[pq.ParquetWriter] = None
+
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema)
+
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def export_xlsx(chunks: Iterator[pd.DataFrame], sink: BinaryIO) -> None:
+    """
+    Writes the chunks as XLSX using the write-only mode of openpyxl, which streams the rows
+    instead of keeping the whole worksheet in memory.
+    """
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Relatório')
+
+    for index, chunk in enumerate(chunks):
+        if index == 0:
+            worksheet.append(list(chunk.columns))
+
+        numeric = chunk.select_dtypes('number').columns
+        # A new frame, the chunk is a slice of the report
+        rows = chunk.assign(**{column: chunk[column].astype(np.float64).round(2) for column in numeric})
+        rows = rows.astype(object)
+        rows = rows.where(rows.notna(), None)
+
+        for row in rows.itertuples(index=False, name=None):
+            worksheet.append(row)
+
+    workbook.save(sink)
+
+
+def export_report(  # noqa: PLR0913
+    df: pd.DataFrame,
+    export_format: str,
+    column_names: list[str],
+    *,
+    sink: BinaryIO,
+    positions: Optional[np.ndarray] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> None:
+    """
+    Streams the report to the sink in the given format.
+    Args:
+        df (pd.DataFrame): Report to export.
+        export_format (str): One of EXPORT_FORMATS.
+        column_names (list[str]): Flat names of the columns, in order.
+        sink (BinaryIO): Binary file object to write to.
+        positions (np.ndarray, optional): Positions of the rows to export, in order. Defaults to all rows.
+        chunk_size (int): Number of rows per chunk.
+    """
+    writers = {'CSV': export_csv, 'XLSX': export_xlsx, 'Parquet': export_parquet}
+
+    if export_format not in writers:
+        raise ValueError(f'Formato de exportação inválido: {export_format}')
+
+    chunks = iter_chunks(df, column_names, positions=positions, chunk_size=chunk_size)
+    writers[export_format](chunks, sink)
@@ -0,0 +1,91 @@
+from typing import Any, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class TableWindow(NamedTuple):
+    frame: pd.DataFrame
+    total_rows: int
+    page: int
+    pages: int
+    first_row: int
+    last_row: int
+
+
+def _column_sort_values(column: pd.Series) -> np.ndarray:
+    """
+    Returns the values used to sort a column, with missing values as NaN.
+    Categorical columns are sorted through their codes, as their categories are sorted.
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy()
+        if not column.cat.categories.is_monotonic_increasing:
+            # Rank of each category, so the codes follow the order of the values
+            ranks = np.argsort(np.argsort(column.cat.categories.to_numpy(), kind='stable'))
+            codes = np.where(codes >= 0, ranks[codes], -1)
+        return np.where(codes >= 0, codes, np.nan)
+
+    if column.dtype.kind in 'iuf':
+        return column.to_numpy(dtype=np.float64, na_value=np.nan)
+
+    # Object columns: rank the values, missing ones stay NaN
+    codes, _ = pd.factorize(column, sort=True)
+    return np.where(codes >= 0, codes, np.nan)
+
+
+def sort_positions(df: pd.DataFrame, positions: np.ndarray, column: Optional[Any], ascending: bool) -> np.ndarray:
+    """
+    Sorts the row positions by a column, keeping missing values last.
+    Args:
+        df (pd.DataFrame): DataFrame being displayed.
+        positions (np.ndarray): Positions of the rows to sort.
+        column (Any, optional): Column to sort by, None keeps the current order.
+        ascending (bool): Sort direction.
+    Returns:
+        np.ndarray: The positions in display order.
+    """
+    if column is None or len(positions) == 0:
+        return positions
+
+    values = _column_sort_values(df[column])[positions]
+
+    # Negating keeps NaN at the end for descending order, and the sort stable
+    order = np.argsort(values if ascending else -values, kind='stable')
+
+    return positions[order]
+
+
+def page_count(total_rows: int, page_size: int) -> int:
+    """
+    Returns the number of pages needed to show the rows, at least one.
+    """
+    return max(1, -(-total_rows // page_size))
+
+
+def paginate(df: pd.DataFrame, positions: np.ndarray, page: int, page_size: int) -> TableWindow:
+    """
+    Returns the window of rows of a page, taken from the sorted positions.
+    Args:
+        df (pd.DataFrame): DataFrame being displayed.
+        positions (np.ndarray): Positions of the rows in display order.
+        page (int): Page number, starting at 1.
+        page_size (int): Number of rows per page.
+    Returns:
+        TableWindow: The rows of the page and the pagination state.
+    """
+    total_rows = len(positions)
+    pages = page_count(total_rows, page_size)
+    page = min(max(1, page), pages)
+
+    start = (page - 1) * page_size
+    end = min(start + page_size, total_rows)
+
+    return TableWindow(
+        frame=df.iloc[positions[start:end]],
+        total_rows=total_rows,
+        page=page,
+        pages=pages,
+        first_row=start + 1 if total_rows else 0,
+        last_row=end,
+    )
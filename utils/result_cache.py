@@ -0,0 +1,128 @@
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Protocol
+
+from config.settings import get_settings
+
+# Marks a missing entry, as None is a valid cached result
+MISSING = object()
+
+
+class CacheBackend(Protocol):
+    """
+    Storage used by ResultCache. Keys are (namespace, arguments) tuples.
+    """
+
+    def get(self, key: tuple[str, Hashable]) -> Any: ...
+
+    def set(self, key: tuple[str, Hashable], value: Any, ttl: Optional[float]) -> None: ...
+
+    def clear(self, namespace: Optional[str] = None) -> None: ...
+
+
+class InMemoryBackend:
+    """
+    Thread-safe in-process storage with per-entry TTL and least-recently-used eviction.
+    Works the same inside the Streamlit server, where it is shared by every session,
+    and in workers, CLIs and benchmarks.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, Hashable], tuple[Any, Optional[float]]] = OrderedDict()
+
+    def get(self, key: tuple[str, Hashable]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return MISSING
+
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() > expires_at:
+                del self._entries[key]
+                return MISSING
+
+            self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key: tuple[str, Hashable], value: Any, ttl: Optional[float]) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+
+            while self.max_entries is not None and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                return
+
+            for key in [key for key in self._entries if key[0] == namespace]:
+                del self._entries[key]
+
+
+class ResultCache:
+    """
+    Memoization of function results behind a pluggable backend.
+    Services depend on this cache instead of st.cache_data, so the data path runs with or
+    without a Streamlit runtime. The backend can be replaced at any time with use(), the
+    decorated functions resolve it on every call.
+    Results are returned as stored, callers must not mutate them.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def use(self, backend: CacheBackend) -> None:
+        """
+        Replaces the backend of the cache.
+        """
+        self.backend = backend
+
+    def cached(self, namespace: str, ttl: Optional[float] = None) -> Callable:
+        """
+        Decorator that caches the results of a function by its arguments.
+        The arguments must be JSON serializable (or have a stable str), as they form the key.
+        Exceptions are not cached. The decorated function gets a clear() method.
+        Args:
+            namespace (str): Namespace of the entries, usually the name of the dataset.
+            ttl (float, optional): Time to live in seconds, None to keep until cleared.
+        """
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs) -> Any:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key = (namespace, json.dumps(bound.arguments, sort_keys=True, default=str))
+
+                value = self.backend.get(key)
+                if value is not MISSING:
+                    return value
+
+                value = func(*args, **kwargs)
+                self.backend.set(key, value, ttl)
+
+                return value
+
+            wrapper.clear = lambda: self.backend.clear(namespace)
+
+            return wrapper
+
+        return decorator
+
+
+result_cache = ResultCache(InMemoryBackend(max_entries=get_settings().cache.result_cache_max_entries))
@@ -0,0 +1,103 @@
+import functools
+import inspect
+import json
+import logging
+import threading
+from typing import Any, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """
+    In-flight computation shared by all the callers of the same key.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Request coalescing for identical concurrent calls.
+    While a computation for a key is in flight, other callers with the same key wait for it
+    and share its result (or its exception) instead of running the computation again.
+    The shared result is returned to every caller as is, so callers must not mutate it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Executes the function for the key, or waits for the execution already in flight.
+        Args:
+            key (Hashable): Key that identifies the computation.
+            func (Callable): Function to execute.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+        Returns:
+            Any: The result of the function.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                call.waiters += 1
+
+        if not leader:
+            logger.debug(f'Aguardar execução em curso para a chave {key}')
+            call.done.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+            call.done.set()
+
+            if call.waiters:
+                logger.info(f'Execução partilhada com {call.waiters} pedidos concorrentes para a chave {key}')
+
+    def coalesce(self, namespace: str) -> Callable:
+        """
+        Decorator that coalesces concurrent calls of a function with the same arguments.
+        Args:
+            namespace (str): Namespace of the keys, usually the name of the dataset.
+        """
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            signature = inspect.signature(func)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs) -> Any:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key = (namespace, json.dumps(bound.arguments, sort_keys=True, default=str))
+
+                return self.do(key, func, *args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,266 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_write_lock = threading.Lock()
+
+
+class Span:
+    """
+    A timed operation of a traced run, e.g. a service call or a database query.
+    Attributes set with set() (rows, parameters, cache status) are written with the span.
+    """
+
+    __slots__ = ('attributes', 'duration_ms', 'name', 'parent_id', 'span_id', 'start', 'trace')
+
+    def __init__(self, trace: '_Trace', name: str, parent_id: Optional[str], attributes: dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.time()
+        self.duration_ms: Optional[float] = None
+
+    def set(self, **attributes: Any) -> None:
+        """
+        Adds attributes to the span.
+        """
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'trace_id': self.trace.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'duration_ms': self.duration_ms,
+            'thread': threading.current_thread().name,
+            **({'attributes': self.attributes} if self.attributes else {}),
+        }
+
+
+class _Trace:
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.spans: list[dict[str, Any]] = []
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('current_span', default=None)
+
+
+def current_span() -> Optional[Span]:
+    """
+    Returns the innermost open span of the current context, None outside a traced run.
+    """
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    """
+    Returns the trace ID of the current run, None outside a traced run.
+    """
+    current = _current_span.get()
+
+    return current.trace.trace_id if current else None
+
+
+def _trace_path() -> str:
+    settings = get_settings()
+
+    return os.path.join(settings.logging.dir, settings.tracing.filename)
+
+
+def _write(spans: list[dict[str, Any]]) -> None:
+    """
+    Appends the spans of a finished run to the trace file, one JSON object per line.
+    The file is rotated to a single backup when it exceeds TracingSettings.max_bytes.
+    """
+    path = _trace_path()
+    lines = ''.join(json.dumps(span, ensure_ascii=False, default=str) + '\n' for span in spans)
+
+    try:
+        with _write_lock:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+            if os.path.exists(path) and os.path.getsize(path) > get_settings().tracing.max_bytes:
+                os.replace(path, f'{path}.1')
+
+            with open(path, 'a', encoding='utf-8') as file:
+                file.write(lines)
+    except OSError as e:
+        logger.error(f'Erro ao escrever os spans do trace: {e}')
+
+
+@contextmanager
+def _open_span(trace: _Trace, name: str, parent_id: Optional[str], attributes: dict[str, Any]) -> Iterator[Span]:
+    span = Span(trace, name, parent_id, attributes)
+    token = _current_span.set(span)
+    started = time.perf_counter()
+
+    try:
+        yield span
+    except BaseException as e:
+        # Streamlit control flow (st.rerun, st.stop) also ends the run with an exception
+        span.set(error=type(e).__name__)
+        raise
+    finally:
+        span.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        _current_span.reset(token)
+        trace.spans.append(span.to_dict())
+
+
+@contextmanager
+def trace_run(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Traces a run (a page execution, a prefetch or a worker run) under a new trace ID.
+    The spans opened inside it are nested under its root span, and all of them are written
+    to the trace file when it ends.
+    Args:
+        name (str): Name of the run, e.g. the page title.
+        **attributes: Attributes of the root span, e.g. the user.
+    Yields:
+        Optional[Span]: The root span, None if tracing is disabled.
+    """
+    if not get_settings().tracing.enabled:
+        yield None
+        return
+
+    trace = _Trace()
+
+    try:
+        with _open_span(trace, name, None, attributes) as root:
+            yield root
+    finally:
+        _write(trace.spans)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Times a block as a child of the current span. Outside a traced run it does nothing.
+    Args:
+        name (str): Name of the span, e.g. 'db.execute_query'.
+        **attributes: Attributes of the span.
+    Yields:
+        Optional[Span]: The span, None outside a traced run.
+    """
+    parent = _current_span.get()
+
+    if parent is None:
+        yield None
+        return
+
+    with _open_span(parent.trace, name, parent.span_id, attributes) as child:
+        yield child
+
+
+def _default_rows(result: Any) -> Optional[int]:
+    if hasattr(result, 'shape'):
+        return int(result.shape[0])
+    if isinstance(result, (list, dict)):
+        return len(result)
+
+    return None
+
+
+def traced(name: str, rows: Callable[[Any], Optional[int]] = _default_rows, params: tuple[str, ...] = ()) -> Callable:
+    """
+    Decorator that wraps each call of a function in a span, with the number of rows of its result.
+    Args:
+        name (str): Name of the span.
+        rows (Callable): Returns the number of rows of the result, None if not applicable.
+            Defaults to the length of DataFrames, lists and dicts.
+        params (tuple[str, ...]): Keyword arguments of the call recorded as attributes of the span.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> Any:
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+
+            with span(name, **{param: kwargs[param] for param in params if param in kwargs}) as current:
+                result = func(*args, **kwargs)
+
+                count = rows(result)
+                if count is not None:
+                    current.set(rows=count)
+
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+def read_traces(limit: int = 50) -> list[list[dict[str, Any]]]:
+    """
+    Reads the most recent traced runs from the trace file.
+    Args:
+        limit (int): Maximum number of runs.
+    Returns:
+        list[list[dict[str, Any]]]: The spans of each run, most recent run first, root span first.
+    """
+    path = _trace_path()
+    traces: dict[str, list[dict[str, Any]]] = {}
+
+    if not os.path.exists(path):
+        return []
+
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            traces.setdefault(record['trace_id'], []).append(record)
+
+    runs = [sorted(spans, key=lambda s: (s['parent_id'] is not None, s['start'])) for spans in traces.values()]
+    runs.sort(key=lambda spans: spans[0]['start'], reverse=True)
+
+    return runs[:limit]
+
+
+def waterfall(spans: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Orders the spans of a run as a waterfall: each span after its parent, siblings by start time.
+    Args:
+        spans (list[dict[str, Any]]): The spans of a run, as returned by read_traces.
+    Returns:
+        list[dict[str, Any]]: The spans with their depth and their offset from the start of the run, in ms.
+    """
+    if not spans:
+        return []
+
+    children: dict[Optional[str], list[dict[str, Any]]] = {}
+    for record in spans:
+        children.setdefault(record['parent_id'], []).append(record)
+
+    run_start = min(record['start'] for record in spans)
+    ordered = []
+    # Spans whose parent is missing (e.g. a run cut by a rotation) are shown as roots
+    span_ids = {record['span_id'] for record in spans}
+    stack = [(record, 0) for record in spans if record['parent_id'] not in span_ids]
+    stack.sort(key=lambda item: item[0]['start'], reverse=True)
+
+    while stack:
+        record, depth = stack.pop()
+        ordered.append({**record, 'depth': depth, 'offset_ms': round((record['start'] - run_start) * 1000, 3)})
+
+        for child in sorted(children.get(record['span_id'], []), key=lambda s: s['start'], reverse=True):
+            stack.append((child, depth + 1))
+
+    return ordered
@@ -0,0 +1,81 @@
+"""
+Precompute worker for the dashboard reports, runs outside Streamlit.
+
+Loads the datasets of every registered report for its standard parameter sets and writes
+them to the shared disk cache, where the dashboard reads them before falling back to a
+live load. Run it next to the dashboard, e.g. as a service or a cron job.
+
+Usage:
+    python worker.py                      # every PRECOMPUTE_INTERVAL seconds
+    python worker.py --once               # a single run, e.g. from cron
+    python worker.py --report annual_revenue_per_customer --interval 600
+"""
+
+import argparse
+import logging
+import time
+
+from config.logging import setup_logging
+from config.settings import get_settings
+from reports.registry import REPORTS, ReportDefinition
+from reports.runtime import ReportRuntime
+from utils.tracing import trace_run
+
+logger = logging.getLogger('worker')
+
+
+def run_once(reports: list[ReportDefinition]) -> int:
+    """
+    Precomputes the standard parameter sets of the reports.
+    Args:
+        reports (list[ReportDefinition]): Reports to precompute.
+    Returns:
+        int: Number of parameter sets that failed.
+    """
+    failures = 0
+
+    for report in reports:
+        if report.standard_params is None:
+            continue
+
+        for params in report.standard_params():
+            started = time.perf_counter()
+
+            try:
+                with trace_run(f'worker.{report.key}', **params):
+                    ReportRuntime.precompute(report, params)
+            except Exception as e:
+                failures += 1
+                logger.error(f'Erro ao pré-calcular {report.key} {params}: {e}', exc_info=True)
+                continue
+
+            logger.info(f'Pré-calculado {report.key} {params} em {time.perf_counter() - started:.2f}s')
+
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Pré-cálculo dos relatórios do dashboard.')
+    parser.add_argument('--once', action='store_true', help='executar uma única vez e terminar')
+    parser.add_argument(
+        '--interval', type=float, default=get_settings().precompute.interval, help='segundos entre execuções'
+    )
+    parser.add_argument('--report', action='append', choices=sorted(REPORTS), help='relatório a pré-calcular')
+    args = parser.parse_args()
+
+    setup_logging()
+
+    reports = [REPORTS[key] for key in args.report] if args.report else list(REPORTS.values())
+    logger.info(f'Worker iniciado para {", ".join(report.key for report in reports)}')
+
+    while True:
+        failures = run_once(reports)
+
+        if args.once:
+            return 1 if failures else 0
+
+        time.sleep(max(args.interval, 1))
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())